@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+ROLE_CLAIMS = ('username', 'role', 'is_superuser')
+
+
+def role_claims_key(user_id):
+    return f'jwt-role-claims:{user_id}'
+
+
+def issue_access_token(user):
+    """Выдаёт AccessToken; при JWT_ROLE_CLAIMS кладёт в него роль."""
+    token = AccessToken.for_user(user)
+    if settings.JWT_ROLE_CLAIMS:
+        for claim in ROLE_CLAIMS:
+            token[claim] = getattr(user, claim)
+    return token
+
+
+def current_role_claims(user_id):
+    """Актуальные username, роль и флаг суперюзера активного пользователя.
+
+    Кэшируются на JWT_ROLE_CLAIMS_TTL секунд и сбрасываются при сохранении
+    или удалении пользователя, так что БД читается не на каждый запрос.
+    """
+    key = role_claims_key(user_id)
+    claims = cache.get(key)
+    if claims is None:
+        claims = User.objects.filter(
+            pk=user_id, is_active=True
+        ).values_list(*ROLE_CLAIMS).first() or ()
+        cache.set(key, claims, settings.JWT_ROLE_CLAIMS_TTL)
+    return tuple(claims)
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь из токена, которого достаточно для проверки прав."""
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    @property
+    def is_user(self):
+        return self.role == User.USER
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, не загружающий User для токенов с ролью.
+
+    Токены без роли (или при выключенном JWT_ROLE_CLAIMS) обрабатываются
+    как обычно, с загрузкой пользователя из БД.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.JWT_ROLE_CLAIMS or 'role' not in validated_token:
+            return super().get_user(validated_token)
+        user = RoleTokenUser(validated_token)
+        claims = tuple(validated_token.get(claim) for claim in ROLE_CLAIMS)
+        if current_role_claims(user.id) != claims:
+            raise AuthenticationFailed(
+                'Данные пользователя изменились, получите новый токен.',
+                code='role_changed'
+            )
+        return user
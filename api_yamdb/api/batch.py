@@ -0,0 +1,127 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+# Заголовки исходного запроса, которые не переносятся в подзапросы:
+# тело и условия у каждого подзапроса свои.
+SKIPPED_META = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'QUERY_STRING',
+                'PATH_INFO', 'wsgi.input')
+
+
+def wsgi_str(value):
+    """Строка WSGI-окружения: байты UTF-8 в latin-1, как требует PEP 3333."""
+    return value.encode().decode('iso-8859-1')
+
+
+def sub_request(request, item):
+    """WSGIRequest подзапроса с заголовками и авторизацией исходного."""
+    url = urlsplit(item['url'])
+    body = b''
+    if 'body' in item:
+        body = json.dumps(item['body']).encode()
+    environ = {
+        key: value for key, value in request.META.items()
+        if key not in SKIPPED_META and not key.startswith('HTTP_IF_')
+    }
+    environ.update({
+        'REQUEST_METHOD': item['method'],
+        # Сервер WSGI передаёт путь уже раскодированным.
+        'PATH_INFO': wsgi_str(unquote(url.path)),
+        'QUERY_STRING': wsgi_str(url.query),
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+    })
+    return WSGIRequest(environ)
+
+
+def response_body(response):
+    if response.streaming:
+        content = b''.join(response.streaming_content)
+    else:
+        content = response.content
+    if not content:
+        return None
+    if 'json' in response.get('Content-Type', ''):
+        return json.loads(content)
+    return content.decode(response.charset)
+
+
+def dispatch(request, item):
+    """Ответ на подзапрос; ошибка в нём не прерывает остальные."""
+    try:
+        return dispatch_item(request, item)
+    except Exception:
+        logger.exception('Ошибка подзапроса %s %s', item['method'],
+                         item['url'])
+        return {'status': 500, 'headers': {},
+                'body': {'detail': 'Внутренняя ошибка сервера.'}}
+
+
+def dispatch_item(request, item):
+    """Выполняет подзапрос через URL-роутер без HTTP и middleware."""
+    sub = sub_request(request, item)
+    try:
+        match = resolve(sub.path_info)
+    except Resolver404:
+        return {'status': 404, 'headers': {},
+                'body': {'detail': 'Страница не найдена.'}}
+    if match.url_name == 'batch':
+        return {'status': 400, 'headers': {},
+                'body': {'detail': 'Вложенный batch не поддерживается.'}}
+    response = match.func(sub, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return {
+        'status': response.status_code,
+        'headers': dict(response.items()),
+        'body': response_body(response),
+    }
+
+
+def dispatch_in_thread(request, item):
+    try:
+        return dispatch(request, item)
+    finally:
+        # Соединения с БД у каждого потока свои.
+        connections.close_all()
+
+
+def run_batch(request, items, parallel=False):
+    """Ответы на подзапросы в том же порядке.
+
+    При `parallel` идущие подряд GET выполняются в пуле из
+    BATCH_MAX_WORKERS потоков; запись ждёт все чтения перед ней
+    и выполняется в текущем потоке, так что порядок записи и чтения
+    сохраняется.
+    """
+    if not parallel:
+        return [dispatch(request, item) for item in items]
+    results = [None] * len(items)
+    reads = []
+
+    def collect():
+        for index, future in reads:
+            results[index] = future.result()
+        reads.clear()
+
+    with ThreadPoolExecutor(settings.BATCH_MAX_WORKERS) as pool:
+        for index, item in enumerate(items):
+            if item['method'] == 'GET':
+                reads.append(
+                    (index, pool.submit(dispatch_in_thread, request, item))
+                )
+                continue
+            collect()
+            results[index] = dispatch(request, item)
+        collect()
+    return results
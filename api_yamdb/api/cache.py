@@ -0,0 +1,305 @@
+import hashlib
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .mixins import ordering_columns
+from .permissions import IsAdmin
+
+
+def version_key(name):
+    return f'version:{name}'
+
+
+class VersionMemo(threading.local):
+    """Версии, уже прочитанные текущим запросом этого потока.
+
+    `states` — словарь на время запроса (его заводят сигналы
+    request_started и request_finished) и None вне запроса: справочники
+    и ETag читают общий кэш один раз за запрос, а не на каждое обращение.
+    """
+    states = None
+
+
+version_memo = VersionMemo()
+
+
+def new_version():
+    """Новое случайное значение счётчика.
+
+    Совпадение с прежним значением практически исключено даже у разных
+    процессов, в отличие от отметок времени грубых часов.
+    """
+    return secrets.randbits(64)
+
+
+def get_version_state(name):
+    """Пара (счётчик, время изменения) коллекции.
+
+    Пара хранится одним ключом: при вытеснении из кэша счётчик и дата
+    пропадают вместе, и дата не может остаться от другой версии.
+    """
+    states = version_memo.states
+    if states is not None and name in states:
+        return states[name]
+    key = version_key(name)
+    state = cache.get(key)
+    if state is None:
+        # Новое значение после вытеснения или истечения счётчика
+        # не совпадёт со старыми ключами и ETag.
+        fresh = (new_version(), int(time.time()))
+        if cache.add(key, fresh, settings.CACHE_VERSION_TIMEOUT):
+            state = fresh
+        else:
+            state = cache.get(key, fresh)
+    if states is not None:
+        states[name] = state
+    return state
+
+
+def get_version(name):
+    """Счётчик версии коллекции; меняется при каждой записи в неё."""
+    return get_version_state(name)[0]
+
+
+def bump_version(name):
+    """Меняет счётчик после фиксации текущей транзакции.
+
+    Смена до фиксации дала бы чтению из другого соединения новый ETag
+    и ключ кэша при старых строках, и старые данные жили бы под новой
+    версией. Вне транзакции счётчик меняется сразу.
+    """
+    transaction.on_commit(lambda: set_new_version(name))
+
+
+def set_new_version(name):
+    # Не incr: у файлового кэша это чтение и запись без блокировки,
+    # и одно из двух одновременных увеличений потерялось бы. Любое
+    # новое значение отличается от всех, под которыми что-то закэшировано.
+    state = (new_version(), int(time.time()))
+    cache.set(version_key(name), state, settings.CACHE_VERSION_TIMEOUT)
+    if version_memo.states is not None:
+        version_memo.states[name] = state
+
+
+# Попадания и промахи кэша списков в памяти процесса: запись счётчика
+# в общий кэш на каждый запрос стоила бы дороже самого попадания.
+list_cache_stats = Counter()
+list_cache_stats_lock = threading.Lock()
+
+
+def increment(name):
+    with list_cache_stats_lock:
+        list_cache_stats[name] += 1
+
+
+class CachedListMixin:
+    """Кэширует ответы list по нормализованным параметрам запроса.
+
+    Кэш сбрасывается увеличением версии `list_cache_name` из сигналов.
+    """
+    list_cache_name = None
+
+    def get_list_cache_key(self, request):
+        params = urlencode(sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+        ))
+        digest = hashlib.md5(
+            f'{request.build_absolute_uri(request.path)}?{params}'.encode()
+        ).hexdigest()
+        versions = '.'.join(
+            str(get_version(name))
+            for name in self.get_list_version_names(request)
+        )
+        return f'list:{self.list_cache_name}:{versions}:{digest}'
+
+    def get_list_version_names(self, request):
+        """Счётчики, от которых зависит состав и порядок страницы."""
+        return (self.list_cache_name,)
+
+    def pack_results(self, results):
+        return results
+
+    def unpack_results(self, packed):
+        return packed
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            increment((self.list_cache_name, 'hits'))
+            data['results'] = self.unpack_results(data['results'])
+            return Response(data, headers={'X-Cache': 'HIT'})
+        increment((self.list_cache_name, 'misses'))
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200 and 'results' in response.data:
+            data = OrderedDict(response.data)
+            data['results'] = self.pack_results(data['results'])
+            cache.set(key, data, settings.LIST_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    @action(
+        detail=False,
+        url_path='cache-stats',
+        permission_classes=(IsAdmin,),
+        pagination_class=None,
+    )
+    def cache_stats(self, request):
+        """Счётчики процесса, который обработал запрос."""
+        name = self.list_cache_name
+        return Response({
+            'hits': list_cache_stats[(name, 'hits')],
+            'misses': list_cache_stats[(name, 'misses')],
+            'version': get_version(name),
+        })
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для list по счётчикам версий.
+
+    `version_names` — счётчики, от которых зависит ответ; в именах можно
+    подставлять аргументы URL: 'reviews:{title_id}'. Совпавший
+    If-None-Match или If-Modified-Since получает 304 до запроса к БД
+    и сериализации.
+    """
+    version_names = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if hasattr(cls, 'as_view') and not cls.version_names:
+            raise ImproperlyConfigured(
+                f'{cls.__name__}: укажите version_names.'
+            )
+
+    def get_version_names(self):
+        return tuple(
+            name.format(**self.kwargs) for name in self.version_names
+        )
+
+    def get_validators(self, request):
+        names = self.get_version_names()
+        states = [get_version_state(name) for name in names]
+        versions = [version for version, _ in states]
+        etag = quote_etag(hashlib.md5(
+            f'{request.get_full_path()}|{request.accepted_media_type}|'
+            f'{versions}'.encode()
+        ).hexdigest())
+        last_modified = max(
+            (modified for _, modified in states), default=None
+        )
+        # Дата в заголовке с точностью до секунды: запись в ту же секунду
+        # не была бы видна по If-Modified-Since, такую дату не отдаём.
+        if last_modified is not None and last_modified >= int(time.time()):
+            last_modified = None
+        return etag, last_modified
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """ConditionalGetMixin, который проверяет и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+def object_key(name, pk):
+    return f'object:{name}:{pk}'
+
+
+def forget_objects(name, pks):
+    """Сбрасывает представления объектов после фиксации транзакции.
+
+    Сброс до фиксации не помог бы: чтение из другого соединения успело бы
+    положить в кэш старые строки. Ключи собираются сразу, пока `pks`
+    (например, queryset в pre_delete) ещё указывает на нужные объекты.
+    """
+    keys = [object_key(name, pk) for pk in pks]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class ObjectCacheMixin:
+    """Кэширует представление каждого объекта по id.
+
+    Из БД выбираются только id страницы (и поля сортировки для курсора),
+    представления берутся одним get_many, а из БД строятся только промахи.
+    Работает вместе с FastReadMixin; в кэше списков хранятся только id.
+    """
+    object_cache_name = None
+
+    def get_rows_queryset(self, queryset):
+        columns = {'id', *ordering_columns(queryset)}
+        return queryset.prefetch_related(None).values(*columns)
+
+    def render_rows(self, rows):
+        objects = self.get_cached_objects([row['id'] for row in rows])
+        # Кэшу списков нужны id страницы, даже если ?fields= их не включает.
+        self.page_ids = [item['id'] for item in objects]
+        return self.trim(objects)
+
+    def pack_results(self, results):
+        if self.row_builder is None:
+            return super().pack_results(results)
+        return self.page_ids
+
+    def unpack_results(self, packed):
+        if self.row_builder is None:
+            return super().unpack_results(packed)
+        return self.trim(self.get_cached_objects(packed))
+
+    def get_multi_get_items(self, values):
+        objects = self.get_cached_objects(values)
+        return dict(zip((item['id'] for item in objects), self.trim(objects)))
+
+    def trim(self, objects):
+        """Оставляет в полных представлениях из кэша только нужные поля."""
+        names = self.get_row_builder().names
+        if len(names) == len(self.row_builder.fields):
+            return objects
+        return [{name: item[name] for name in names} for item in objects]
+
+    def get_cached_objects(self, ids):
+        keys = {pk: object_key(self.object_cache_name, pk) for pk in ids}
+        cached = cache.get_many(list(keys.values()))
+        missing = [pk for pk in ids if keys[pk] not in cached]
+        if missing:
+            builder = self.row_builder()
+            rows = self.get_queryset().prefetch_related(None).filter(
+                pk__in=missing
+            ).values(*builder.columns)
+            fresh = {
+                keys[item['id']]: item
+                for item in builder.render(list(rows))
+            }
+            cache.set_many(fresh, settings.OBJECT_CACHE_TIMEOUT)
+            cached.update(fresh)
+        return [cached[keys[pk]] for pk in ids if keys[pk] in cached]
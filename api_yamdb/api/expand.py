@@ -0,0 +1,122 @@
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from reviews.models import Comment, Review
+
+from .mixins import SparseFieldsMixin
+from .rows import CommentRows, ReviewRows
+
+
+class Expansion:
+    """Уровень ?expand=: последние объекты каждого родителя.
+
+    `parent_field` — столбец со ссылкой на родителя, `limit_param` —
+    параметр запроса с числом объектов на одного родителя.
+    """
+
+    def __init__(self, name, model, parent_field, row_builder, limit_param):
+        self.name = name
+        self.model = model
+        self.parent_field = parent_field
+        self.row_builder = row_builder
+        self.limit_param = limit_param
+
+    def fetch(self, parent_ids, limit):
+        """Словарь {id родителя: представления} одним запросом.
+
+        Коррелированный подзапрос с LIMIT идёт по индексу
+        (родитель, pub_date, id) и читает не больше `limit` строк
+        на родителя.
+        """
+        latest = self.model.objects.filter(
+            **{self.parent_field: OuterRef(self.parent_field)}
+        ).order_by('-pub_date', '-id').values('id')[:limit]
+        builder = self.row_builder()
+        rows = list(self.model.objects.filter(
+            id__in=Subquery(latest),
+            **{f'{self.parent_field}__in': parent_ids}
+        ).order_by('-pub_date', '-id').values(
+            self.parent_field, *builder.columns
+        ))
+        children = {}
+        for row, item in zip(rows, builder.render(rows)):
+            children.setdefault(row[self.parent_field], []).append(item)
+        return children
+
+
+REVIEWS = Expansion('reviews', Review, 'title_id', ReviewRows,
+                    'reviews_limit')
+COMMENTS = Expansion('comments', Comment, 'review_id', CommentRows,
+                     'comments_limit')
+
+
+class ExpandMixin:
+    """?expand= со вложенными последними отзывами и комментариями.
+
+    `expansions` — цепочка уровней вьюсета: ?expand=reviews.comments
+    раскрывает и отзывы, и комментарии к ним. Каждый уровень — один
+    запрос на всю страницу, сколько бы родителей в ней ни было.
+    Работает вместе с FastReadMixin.
+    """
+    expansions = ()
+    expand_actions = ('list', 'retrieve')
+
+    @cached_property
+    def expand_depth(self):
+        """Сколько уровней цепочки раскрыть; 0 — без ?expand=."""
+        value = self.request.query_params.get('expand')
+        if value is None:
+            return 0
+        if self.action not in self.expand_actions:
+            raise ValidationError(
+                {'expand': ['Недоступно для этого запроса.']}
+            )
+        paths = {
+            '.'.join(level.name for level in self.expansions[:depth]): depth
+            for depth in range(1, len(self.expansions) + 1)
+        }
+        requested = SparseFieldsMixin.split_names(value)
+        unknown = requested - set(paths)
+        if unknown or not requested:
+            raise ValidationError({
+                'expand': [f'Доступны: {", ".join(paths)}.']
+            })
+        fields = getattr(self, 'sparse_fields', None)
+        if fields is not None and 'id' not in fields:
+            raise ValidationError(
+                {'expand': ['Вложенным объектам нужно поле id.']}
+            )
+        depth = max(paths[path] for path in requested)
+        for expansion in self.expansions[:depth]:
+            self.get_expand_limit(expansion)
+        return depth
+
+    def get_expand_limit(self, expansion):
+        value = self.request.query_params.get(expansion.limit_param)
+        if value is None:
+            return settings.EXPAND_DEFAULT_LIMIT
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= settings.EXPAND_MAX_LIMIT:
+            raise ValidationError({expansion.limit_param: [
+                f'Целое число от 1 до {settings.EXPAND_MAX_LIMIT}.'
+            ]})
+        return limit
+
+    def render_rows(self, rows):
+        rendered = super().render_rows(rows)
+        parents = rendered
+        for expansion in self.expansions[:self.expand_depth]:
+            children = expansion.fetch(
+                [item['id'] for item in parents],
+                self.get_expand_limit(expansion)
+            ) if parents else {}
+            for item in parents:
+                item[expansion.name] = children.get(item['id'], [])
+            parents = [
+                child for item in parents for child in item[expansion.name]
+            ]
+        return rendered
@@ -1,19 +1,99 @@
 from django_filters import rest_framework as filters
 
-from reviews.models import Title
+from reviews import search
+from reviews.models import GenreTitle, Title
+
+from . import reference
+
+
+class SlugInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Список слагов через запятую: ?genre=drama,comedy."""
 
 
 class TitlesFilter(filters.FilterSet):
-    name = filters.CharFilter(
-        field_name='name',
-        lookup_expr='icontains')
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains')
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains')
+    MATCH_ANY = 'any'
+    MATCH_ALL = 'all'
+    # Каждой сортировке соответствует индекс Title, id замыкает ключ
+    # для курсорной пагинации.
+    ORDERINGS = {
+        'name': ('name', 'id'),
+        'year': ('year', 'id'),
+        'rating': ('-rating', 'id'),
+        'newest': ('-year', '-id'),
+    }
+
+    name = filters.CharFilter(method='filter_name')
+    search = filters.CharFilter(method='filter_search')
+    category = SlugInFilter(method='filter_category')
+    genre = SlugInFilter(method='filter_genre')
+    genre_match = filters.ChoiceFilter(
+        choices=((MATCH_ANY, 'любой из жанров'), (MATCH_ALL, 'все жанры')),
+        method='filter_nothing'
+    )
+    # Поиск подстроки в слагах — прежнее поведение, только по запросу.
+    category_contains = filters.CharFilter(method='filter_category_contains')
+    genre_contains = filters.CharFilter(method='filter_genre_contains')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    # Объявлен последним, чтобы заменить сортировку по релевантности.
+    ordering = filters.ChoiceFilter(
+        choices=(
+            ('name', 'по названию'),
+            ('year', 'по году выхода'),
+            ('rating', 'по рейтингу'),
+            ('newest', 'сначала новые'),
+        ),
+        method='filter_ordering'
+    )
 
     class Meta:
         model = Title
         fields = ['name', 'year', 'genre', 'category']
+
+    def filter_nothing(self, queryset, name, value):
+        return queryset
+
+    def filter_ordering(self, queryset, name, value):
+        return queryset.order_by(*self.ORDERINGS[value])
+
+    def filter_name(self, queryset, name, value):
+        # Слова названия ищутся как префиксы по индексу FTS5.
+        return search.filter_titles(queryset, value, column='name')
+
+    def filter_search(self, queryset, name, value):
+        return search.search_titles(queryset, value)
+
+    def filter_category(self, queryset, name, value):
+        # Слаги сопоставляются со справочником в памяти, без JOIN.
+        return queryset.filter(
+            category_id__in=reference.categories.ids_for_slugs(value)
+        )
+
+    def filter_genre(self, queryset, name, value):
+        genre_ids = reference.genres.ids_for_slugs(value)
+        if self.form.cleaned_data.get('genre_match') != self.MATCH_ALL:
+            return queryset.filter(id__in=self.with_genres(genre_ids))
+        if len(genre_ids) < len(set(value)):
+            return queryset.none()
+        # Один подзапрос на жанр: каждый читает только индекс
+        # (genre, title), без JOIN и DISTINCT.
+        for genre_id in genre_ids:
+            queryset = queryset.filter(id__in=self.with_genres([genre_id]))
+        return queryset
+
+    def filter_category_contains(self, queryset, name, value):
+        return queryset.filter(
+            category_id__in=reference.categories.ids_with_slug(value)
+        )
+
+    def filter_genre_contains(self, queryset, name, value):
+        return queryset.filter(id__in=self.with_genres(
+            reference.genres.ids_with_slug(value)
+        ))
+
+    @staticmethod
+    def with_genres(genre_ids):
+        return GenreTitle.objects.filter(
+            genre_id__in=genre_ids
+        ).values('title_id')
@@ -0,0 +1,233 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from reviews.models import Review, Title
+
+
+class TitleNestedMixin:
+    """Произведение из URL, найденное один раз за запрос.
+
+    Используется в queryset, контексте сериализатора и при создании.
+    """
+
+    @cached_property
+    def title(self):
+        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['title'] = self.title
+        return context
+
+
+class ReviewNestedMixin(TitleNestedMixin):
+    """Отзыв из URL вместе с произведением, проверенные одним запросом."""
+
+    @cached_property
+    def review(self):
+        return get_object_or_404(
+            Review.objects.select_related('title'),
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id')
+        )
+
+    @cached_property
+    def title(self):
+        return self.review.title
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['review'] = self.review
+        return context
+
+
+def ordering_columns(queryset):
+    """Столбцы сортировки queryset'а: по ним курсор строит ссылки."""
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    return [
+        field.lstrip('-') for field in ordering if field.lstrip('-') != 'pk'
+    ]
+
+
+class FastReadMixin:
+    """list/retrieve без сериализаторов: JSON собирается из values().
+
+    Включается атрибутом `row_builder` вьюсета; без него работают
+    обычные сериализаторы.
+    """
+    row_builder = None
+
+    def get_row_builder(self):
+        return self.row_builder()
+
+    def get_rows_queryset(self, queryset):
+        # Столбцы сортировки нужны курсору, даже если их нет в ?fields=;
+        # в ответ попадают только поля построителя.
+        columns = self.get_row_builder().columns
+        columns += [
+            column for column in ordering_columns(queryset)
+            if column not in columns
+        ]
+        return queryset.prefetch_related(None).values(*columns)
+
+    def render_rows(self, rows):
+        return self.get_row_builder().render(rows)
+
+    def list(self, request, *args, **kwargs):
+        if self.row_builder is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.get_rows_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.render_rows(page))
+        return Response(self.render_rows(list(queryset)))
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.row_builder is None:
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_rows_queryset(
+            self.filter_queryset(self.get_queryset())
+        ).filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        row = queryset.first()
+        if row is None:
+            raise Http404
+        self.check_object_permissions(request, row)
+        rendered = self.render_rows([row])
+        if not rendered:
+            raise Http404
+        return Response(rendered[0])
+
+
+class SparseFieldsMixin:
+    """?fields= и ?omit= со списком полей через запятую для list/retrieve.
+
+    Лишние поля не выбираются из БД (столбцы values() у FastReadMixin
+    или only() у сериализатора) и не попадают в ответ.
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    @cached_property
+    def sparse_fields(self):
+        """Запрошенные поля в порядке ответа или None, если ограничений нет."""
+        params = self.request.query_params
+        if self.action not in self.sparse_actions or not (
+            'fields' in params or 'omit' in params
+        ):
+            return None
+        available = self.get_available_fields()
+        requested = self.split_names(params.get('fields')) or set(available)
+        omitted = self.split_names(params.get('omit'))
+        unknown = (requested | omitted) - set(available)
+        if unknown:
+            raise ValidationError({
+                'fields': [f'Неизвестные поля: {", ".join(sorted(unknown))}.']
+            })
+        names = [
+            name for name in available
+            if name in requested and name not in omitted
+        ]
+        if not names:
+            raise ValidationError({'fields': ['Не выбрано ни одного поля.']})
+        return names
+
+    @staticmethod
+    def split_names(value):
+        return {name.strip() for name in (value or '').split(',')} - {''}
+
+    def get_available_fields(self):
+        if getattr(self, 'row_builder', None) is not None:
+            return list(self.row_builder.fields)
+        return list(self.get_serializer_class()().fields)
+
+    def get_row_builder(self):
+        return self.row_builder(self.sparse_fields)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.sparse_fields is None or getattr(
+            self, 'row_builder', None
+        ) is not None:
+            return queryset
+        fields = self.get_serializer_class()().fields
+        model_fields = {
+            field.name for field in queryset.model._meta.concrete_fields
+        }
+        sources = [fields[name].source for name in self.sparse_fields]
+        # Поле не из столбцов модели загрузилось бы отдельным запросом
+        # на каждый объект, тогда безопаснее выбрать строку целиком.
+        if not set(sources) <= model_fields:
+            return queryset
+        return queryset.only(queryset.model._meta.pk.name, *sources)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.sparse_fields is not None:
+            fields = getattr(serializer, 'child', serializer).fields
+            for name in set(fields) - set(self.sparse_fields):
+                fields.pop(name)
+        return serializer
+
+
+class MultiGetMixin:
+    """Несколько объектов за один запрос в list: ?ids=1,5,9.
+
+    Значения сравниваются с `lookup_field` одним запросом IN, объекты
+    идут в порядке запроса, ненайденные значения перечислены в
+    `missing`. Остальные фильтры и пагинация при этом не применяются.
+    """
+    multi_get_param = 'ids'
+
+    def list(self, request, *args, **kwargs):
+        if self.multi_get_param not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        values = self.get_multi_get_values()
+        found = self.get_multi_get_items(values)
+        return Response({
+            'results': [found[value] for value in values if value in found],
+            'missing': [value for value in values if value not in found],
+        })
+
+    def get_multi_get_values(self):
+        """Запрошенные значения без повторов, приведённые к типу поля."""
+        param = self.multi_get_param
+        values = list(dict.fromkeys(
+            value.strip()
+            for value in self.request.query_params[param].split(',')
+            if value.strip()
+        ))
+        if not values:
+            raise ValidationError({param: ['Укажите значения через запятую.']})
+        if len(values) > settings.MULTI_GET_MAX_SIZE:
+            raise ValidationError({param: [
+                f'Не больше {settings.MULTI_GET_MAX_SIZE} значений.'
+            ]})
+        opts = self.get_queryset().model._meta
+        field = opts.pk if self.lookup_field == 'pk' else opts.get_field(
+            self.lookup_field
+        )
+        try:
+            return [field.to_python(value) for value in values]
+        except DjangoValidationError as error:
+            raise ValidationError({param: error.messages})
+
+    def get_multi_get_items(self, values):
+        """Словарь {значение: представление} найденных объектов."""
+        field = self.lookup_field
+        queryset = self.get_queryset().filter(**{f'{field}__in': values})
+        if getattr(self, 'row_builder', None) is None:
+            objects = list(queryset)
+            keys = [getattr(obj, field) for obj in objects]
+            items = self.get_serializer(objects, many=True).data
+        else:
+            rows = list(self.get_rows_queryset(queryset))
+            column = 'id' if field == 'pk' else field
+            keys = [row[column] for row in rows]
+            items = self.render_rows(rows)
+        return dict(zip(keys, items))
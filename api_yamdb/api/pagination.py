@@ -0,0 +1,209 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from reviews.paginator import EstimatedCountPaginator
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """PageNumberPagination с приблизительным count у больших выборок.
+
+    Если count приблизительный, в ответ добавляется count_approximate.
+    """
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.page.paginator.approximate:
+            response.data = OrderedDict([
+                ('count', response.data['count']),
+                ('count_approximate', True),
+                *(
+                    (key, value) for key, value in response.data.items()
+                    if key != 'count'
+                ),
+            ])
+        return response
+
+
+class KeysetPagination(EstimatedCountPagination):
+    """Постраничная пагинация с курсорным режимом по запросу.
+
+    Без параметра ``cursor`` работает как ``EstimatedCountPagination``.
+    С параметром ``cursor`` (в том числе пустым — первая страница) выборка
+    идёт по ключам сортировки queryset'а без ``COUNT(*)`` и ``OFFSET``.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        reverse, position = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [self.invert(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.after(queryset, ordering, position)
+            )
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def get_ordering(self, queryset):
+        ordering = list(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        if not {'pk', 'id', '-pk', '-id'} & set(ordering):
+            ordering.append('pk')
+        return ordering
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @classmethod
+    def after(cls, queryset, ordering, position):
+        """Условие «строго после позиции» для составного ключа."""
+        nulls_largest = connections[queryset.db].features.nulls_order_largest
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            descending = field.startswith('-')
+            beyond = cls.beyond(
+                name, value, descending,
+                nulls_last=nulls_largest != descending,
+                nullable=cls.is_nullable(queryset.model, name)
+            )
+            if beyond is not None:
+                condition |= equal & beyond
+            equal &= Q(**{name: value})
+        return condition
+
+    @staticmethod
+    def beyond(name, value, descending, nulls_last, nullable):
+        """Значения поля строго дальше value; None — таких нет.
+
+        NULL при сортировке идёт первым или последним в зависимости от
+        СУБД и направления, а сравнение с NULL в SQL всегда ложно.
+        """
+        if value is None:
+            if nulls_last:
+                return None
+            return Q(**{f'{name}__isnull': False})
+        lookup = 'lt' if descending else 'gt'
+        condition = Q(**{f'{name}__{lookup}': value})
+        if nulls_last and nullable:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    @staticmethod
+    def is_nullable(model, name):
+        try:
+            return model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return False
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            reverse, position = bool(data['r']), data['p']
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(
+            self.ordering
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return reverse, [
+                self.to_python(model, field.lstrip('-'), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def to_python(model, name, value):
+        """Значение из курсора, приведённое к типу поля сортировки."""
+        if not isinstance(value, (str, int, float, type(None))):
+            raise TypeError(value)
+        try:
+            field = (
+                model._meta.pk if name == 'pk' else model._meta.get_field(name)
+            )
+        except FieldDoesNotExist:
+            # Аннотация вроде search_rank: число как есть.
+            if isinstance(value, str):
+                raise TypeError(value)
+            return value
+        return field.to_python(value)
+
+    def encode_cursor(self, obj, reverse):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            if isinstance(obj, dict):
+                value = obj['id' if name == 'pk' else name]
+            else:
+                value = getattr(obj, name)
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            position.append(value)
+        data = json.dumps({'r': int(reverse), 'p': position})
+        encoded = base64.urlsafe_b64encode(data.encode()).decode()
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
@@ -0,0 +1,109 @@
+import time
+
+from django.conf import settings
+from django.utils.encoding import smart_str
+from rest_framework import filters, serializers
+from rest_framework.response import Response
+from reviews.models import Category, Genre
+
+from .cache import get_version
+
+
+class ReferenceTable:
+    """Копия маленькой справочной таблицы в памяти процесса.
+
+    Перед чтением сверяет номер версии из общего кэша (не чаще раза
+    за запрос, см. VersionMemo); сигналы меняют его при создании,
+    изменении и удалении строки, и каждый процесс перечитывает таблицу
+    одним запросом при следующем обращении.
+    Не реже чем раз в REFERENCE_TABLE_TTL секунд таблица перечитывается
+    и без смены версии.
+    """
+
+    def __init__(self, model, version_name):
+        self.model = model
+        self.version_name = version_name
+        self.state = (None, {}, {}, ())
+        self.expires = 0
+
+    def load(self):
+        version = get_version(self.version_name)
+        now = time.monotonic()
+        if self.state[0] != version or now >= self.expires:
+            rows = sorted(
+                self.model.objects.all(), key=lambda obj: (obj.name, obj.pk)
+            )
+            # Одно присваивание: другие потоки видят либо старое,
+            # либо новое состояние целиком.
+            self.state = (
+                version,
+                {obj.pk: obj for obj in rows},
+                {obj.slug: obj for obj in rows},
+                tuple(rows),
+            )
+            self.expires = now + settings.REFERENCE_TABLE_TTL
+        return self.state
+
+    def all(self):
+        return self.load()[3]
+
+    def get(self, pk):
+        return self.load()[1].get(pk)
+
+    def get_by_slug(self, slug):
+        return self.load()[2].get(slug)
+
+    def search(self, terms):
+        """Строки, в названии которых есть все слова, без учёта регистра."""
+        terms = [term.casefold() for term in terms]
+        return [
+            obj for obj in self.all()
+            if all(term in obj.name.casefold() for term in terms)
+        ]
+
+    def ids_for_slugs(self, slugs):
+        by_slug = self.load()[2]
+        return [by_slug[slug].pk for slug in set(slugs) if slug in by_slug]
+
+    def ids_with_slug(self, value):
+        value = value.casefold()
+        return [obj.pk for obj in self.all() if value in obj.slug.casefold()]
+
+
+categories = ReferenceTable(Category, 'categories')
+genres = ReferenceTable(Genre, 'genres')
+
+
+class ReferenceSlugField(serializers.SlugRelatedField):
+    """SlugRelatedField, который ищет slug в ReferenceTable, а не в БД."""
+
+    def __init__(self, table, **kwargs):
+        self.table = table
+        kwargs.setdefault('queryset', table.model.objects.all())
+        super().__init__(slug_field='slug', **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        obj = self.table.get_by_slug(str(data))
+        if obj is None:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+        return obj
+
+
+class ReferenceListMixin:
+    """list справочника из ReferenceTable: поиск и пагинация в памяти."""
+    reference_table = None
+
+    def list(self, request, *args, **kwargs):
+        rows = self.reference_table.search(
+            filters.SearchFilter().get_search_terms(request)
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(self.get_serializer(rows, many=True).data)
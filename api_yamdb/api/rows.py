@@ -0,0 +1,121 @@
+from rest_framework import serializers
+from reviews.models import GenreTitle
+
+from . import reference
+
+pub_date_field = serializers.DateTimeField()
+
+
+class Rows:
+    """Строит JSON ответа из строк values() без сериализаторов.
+
+    `fields` — поля ответа в порядке сериализатора и столбцы values(),
+    нужные для каждого. Поле без метода render_<имя> берётся из своего
+    единственного столбца. Можно строить только часть полей: `names`.
+    """
+    fields = {}
+
+    def __init__(self, names=None):
+        self.names = tuple(
+            name for name in self.fields if names is None or name in names
+        )
+
+    @property
+    def columns(self):
+        columns = ['id']
+        for name in self.names:
+            columns.extend(
+                column for column in self.fields[name]
+                if column not in columns
+            )
+        return columns
+
+    def prepare(self, rows):
+        """Загружает пачкой то, что нужно всем строкам страницы."""
+
+    def render(self, rows):
+        self.prepare(rows)
+        renderers = [
+            (name, getattr(self, f'render_{name}', None))
+            for name in self.names
+        ]
+        return [
+            {
+                name: row[self.fields[name][0]] if render is None
+                else render(row)
+                for name, render in renderers
+            }
+            for row in rows
+        ]
+
+
+class TitleRows(Rows):
+    """Тот же JSON, что у ReadOnlyTitleSerializer.
+
+    Категории и жанры берутся из справочников в памяти по id.
+    """
+    fields = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating',),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category_id',),
+    }
+
+    def prepare(self, rows):
+        self.genres = {}
+        if 'genre' not in self.names:
+            return
+        for title_id, genre_id in GenreTitle.objects.filter(
+            title_id__in=[row['id'] for row in rows]
+        ).values_list('title_id', 'genre_id'):
+            genre = reference.genres.get(genre_id)
+            if genre is not None:
+                self.genres.setdefault(title_id, []).append(genre)
+
+    def render_genre(self, row):
+        return [
+            {'name': genre.name, 'slug': genre.slug}
+            for genre in sorted(
+                self.genres.get(row['id'], ()),
+                key=lambda genre: (genre.name, genre.pk)
+            )
+        ]
+
+    @staticmethod
+    def render_category(row):
+        category = reference.categories.get(row['category_id'])
+        if category is None:
+            return None
+        return {'name': category.name, 'slug': category.slug}
+
+
+class ReviewRows(Rows):
+    """Тот же JSON, что у ReviewSerializer."""
+    fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+    }
+
+    @staticmethod
+    def render_pub_date(row):
+        return pub_date_field.to_representation(row['pub_date'])
+
+
+class CommentRows(Rows):
+    """Тот же JSON, что у CommentSerializer."""
+    fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+    }
+
+    @staticmethod
+    def render_pub_date(row):
+        return pub_date_field.to_representation(row['pub_date'])
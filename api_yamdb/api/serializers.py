@@ -1,12 +1,28 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from rest_framework.validators import ValidationError
 from reviews.models import Category, Comment, Genre, Review, Title
 from reviews.validators import username_validate
 
+from . import reference
+from .reference import ReferenceSlugField
+
 User = get_user_model()
 
 
+def unique_message(model, field_name):
+    """Текст ошибки уникальности, как у UniqueValidator из ModelSerializer."""
+    field = model._meta.get_field(field_name)
+    return field.error_messages['unique'] % {
+        'model_name': model._meta.verbose_name,
+        'field_label': field.verbose_name,
+    }
+
+
 class UserSerializer(serializers.ModelSerializer):
     username = serializers.CharField(required=True)
 
@@ -20,6 +36,7 @@ class UserSerializer(serializers.ModelSerializer):
             'bio',
             'role'
         )
+        extra_kwargs = {'email': {'validators': []}}
 
     def validate_username(self, value):
         if value == 'me':
@@ -29,12 +46,22 @@ class UserSerializer(serializers.ModelSerializer):
         return value
 
     def validate(self, data):
-        if self.context['request'].POST:
-            sources = list(User.objects.values('username', 'email'))
-            for item in sources:
-                for field in set(item.items()):
-                    if field in set(data.items()):
-                        raise ValidationError('error')
+        lookup = Q()
+        for field in ('username', 'email'):
+            if field in data:
+                lookup |= Q(**{field: data[field]})
+        if not lookup:
+            return data
+        others = User.objects.all()
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        taken = others.filter(lookup).order_by().values_list(
+            'email', flat=True
+        )[:2]
+        if data.get('email') in taken:
+            raise ValidationError({'email': [unique_message(User, 'email')]})
+        if taken:
+            raise ValidationError('error')
         return data
 
 
@@ -95,18 +122,35 @@ class SignUpSerializer(serializers.Serializer):
     def validate(self, data):
         username = data.get('username')
         email = data.get('email')
-        if (
-            User.objects.filter(username=username).exists()
-            and User.objects.get(username=username).email != email
-        ):
-            raise serializers.ValidationError("Пользователь существует!")
-        if (
-            User.objects.filter(email=email).exists()
-            and User.objects.get(email=email).username != username
-        ):
+        self.user = None
+        matches = User.objects.filter(
+            Q(username=username) | Q(email=email)
+        ).order_by()[:2]
+        for user in matches:
+            if user.username == username and user.email == email:
+                self.user = user
+            elif user.username == username:
+                raise serializers.ValidationError("Пользователь существует!")
+        if self.user is None and matches:
             raise serializers.ValidationError("Емайл существует!")
         return data
 
+    def create(self, validated_data):
+        if self.user is not None:
+            return self.user
+        try:
+            with transaction.atomic():
+                return User.objects.create(**validated_data)
+        except IntegrityError:
+            user = User.objects.filter(**validated_data).first()
+            if user is None:
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "Пользователь существует!"
+                    ]
+                })
+            return user
+
     class Meta:
         model = User
         fields = ('username', 'email')
@@ -130,17 +174,16 @@ class ReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Проверьте оценку!')
         return value
 
-    def validate(self, data):
-        current_user = self.context['request'].user
-        title_id = self.context['view'].kwargs.get('title_id')
-        if (
-            current_user.reviews.filter(title=title_id).exists()
-            and self.context['request'].method == 'POST'
-        ):
-            raise serializers.ValidationError(
-                'Больше одного отзыва оставлять нельзя.'
-            )
-        return data
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Больше одного отзыва оставлять нельзя.'
+                ]
+            })
 
     class Meta:
         model = Review
@@ -151,7 +194,7 @@ class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Category
-        exclude = ('id',)
+        exclude = ('id', 'content_hash')
         lookup_field = 'slug'
         extra_kwargs = {
             'url': {'lookup_field': 'slug'}}
@@ -161,7 +204,7 @@ class GenreSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Genre
-        exclude = ('id',)
+        exclude = ('id', 'content_hash')
         lookup_field = 'slug'
         extra_kwargs = {
             'url': {'lookup_field': 'slug'}}
@@ -169,23 +212,54 @@ class GenreSerializer(serializers.ModelSerializer):
 
 class TitleSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True, allow_null=True)
-    genre = serializers.SlugRelatedField(
-        slug_field='slug', many=True, queryset=Genre.objects.all())
-    category = serializers.SlugRelatedField(
-        slug_field='slug', queryset=Category.objects.all())
+    genre = ReferenceSlugField(reference.genres, many=True)
+    category = ReferenceSlugField(reference.categories)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'content_hash')
 
 
 class ReadOnlyTitleSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
     genre = GenreSerializer(many=True)
-    category = CategorySerializer()
+    category = serializers.SerializerMethodField()
 
     class Meta:
         model = Title
         fields = (
             'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
         )
+
+    def get_category(self, obj):
+        category = reference.categories.get(obj.category_id)
+        if category is None:
+            return None
+        return CategorySerializer(category).data
+
+
+class BatchItemSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(
+        choices=('GET', 'POST', 'PUT', 'PATCH', 'DELETE'), default='GET'
+    )
+    url = serializers.CharField()
+    body = serializers.JSONField(required=False)
+
+    def validate_url(self, url):
+        if not url.startswith('/api/v1/'):
+            raise serializers.ValidationError(
+                'Укажите путь внутри /api/v1/.'
+            )
+        return url
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, items):
+        if len(items) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f'Не больше {settings.BATCH_MAX_REQUESTS} подзапросов.'
+            )
+        return items
@@ -0,0 +1,128 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title)
+
+from .authentication import role_claims_key
+from .cache import bump_version, forget_objects, version_memo
+
+User = get_user_model()
+
+
+@receiver(request_started)
+def start_version_memo(sender, **kwargs):
+    version_memo.states = {}
+
+
+@receiver(request_finished)
+def stop_version_memo(sender, **kwargs):
+    version_memo.states = None
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_role_claims(sender, instance, **kwargs):
+    cache.delete(role_claims_key(instance.pk))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_titles(sender, **kwargs):
+    bump_version('titles')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def forget_title(sender, instance, **kwargs):
+    forget_objects('title', [instance.pk])
+    bump_version('titles')
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def forget_genre_title(sender, instance, **kwargs):
+    forget_objects('title', [instance.title_id])
+    bump_version('titles')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def forget_genre_titles(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        forget_objects('title', [instance.pk])
+    elif pk_set:
+        forget_objects('title', pk_set)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def forget_category_titles(sender, instance, **kwargs):
+    # pre_delete: после удаления category_id у произведений уже обнулён.
+    forget_objects('title', Title.objects.filter(
+        category_id=instance.pk
+    ).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def forget_genre_titles_by_genre(sender, instance, **kwargs):
+    forget_objects('title', GenreTitle.objects.filter(
+        genre_id=instance.pk
+    ).values_list('title_id', flat=True))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def forget_review_title(sender, instance, **kwargs):
+    # Отзыв меняет только рейтинг своего произведения: сбрасываются
+    # только страницы, отобранные или упорядоченные по рейтингу.
+    forget_objects('title', [instance.title_id])
+    bump_version('title-ratings')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def touch_categories(sender, **kwargs):
+    bump_version('categories')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def touch_genres(sender, **kwargs):
+    bump_version('genres')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def touch_reviews(sender, instance, **kwargs):
+    bump_version(f'reviews:{instance.title_id}')
+    if kwargs['signal'] is post_delete:
+        bump_version(f'comments:{instance.pk}')
+
+
+@receiver(post_delete, sender=Title)
+def touch_title_reviews(sender, instance, **kwargs):
+    bump_version(f'reviews:{instance.pk}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_comments(sender, instance, **kwargs):
+    bump_version(f'comments:{instance.review_id}')
+    # Общая версия для списков отзывов с ?expand=comments.
+    bump_version('comments')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def touch_users(sender, **kwargs):
+    # Имя автора входит в отзывы и комментарии.
+    bump_version('users')
@@ -1,8 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (APIGetToken, APISignup, CategoryViewSet, CommentViewSet,
-                    GenreViewSet, ReviewViewSet, TitleViewSet, UserViewSet)
+from .views import (APIBatch, APIExport, APIGetToken, APISignup,
+                    CategoryViewSet, CommentViewSet, GenreViewSet,
+                    ReviewViewSet, TitleViewSet, UserViewSet)
 
 router_v1 = DefaultRouter()
 
@@ -28,6 +29,8 @@ urlpatterns = [
         path('auth/', include([
             path('signup/', APISignup.as_view(), name='signup'),
             path('token/', APIGetToken.as_view(), name='token'),
-        ]))
+        ])),
+        path('export/<str:dataset>/', APIExport.as_view(), name='export'),
+        path('batch/', APIBatch.as_view(), name='batch'),
     ]))
 ]
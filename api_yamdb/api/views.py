@@ -2,7 +2,8 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
@@ -10,61 +11,107 @@ from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.export import DATASETS, FORMATS, export
+from reviews.models import Category, Genre, Title
+from reviews.outbox import queue_mail
 
+from . import reference
+from .authentication import issue_access_token
+from .batch import run_batch
+from .cache import (CachedListMixin, ConditionalGetMixin,
+                    ConditionalRetrieveMixin, ObjectCacheMixin)
+from .expand import COMMENTS, REVIEWS, ExpandMixin
 from .filters import TitlesFilter
+from .mixins import (FastReadMixin, MultiGetMixin, ReviewNestedMixin,
+                     SparseFieldsMixin, TitleNestedMixin)
+from .pagination import KeysetPagination
+from .reference import ReferenceListMixin
+from .rows import CommentRows, ReviewRows, TitleRows
 from .permissions import (IsAdmin, IsAdminModeratorOwnerOrReadOnly,
                           IsAdminOrReadOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, GetTokenSerializer,
-                          ProfileEditSerializer, ReadOnlyTitleSerializer,
-                          ReviewSerializer, SignUpSerializer, TitleSerializer,
-                          UserSerializer)
+from .serializers import (BatchSerializer, CategorySerializer,
+                          CommentSerializer, GenreSerializer,
+                          GetTokenSerializer, ProfileEditSerializer,
+                          ReadOnlyTitleSerializer, ReviewSerializer,
+                          SignUpSerializer, TitleSerializer, UserSerializer)
 
 User = get_user_model()
 
 
-class CategoryViewSet(mixins.ListModelMixin,
+class CategoryViewSet(ConditionalGetMixin,
+                      SparseFieldsMixin,
+                      ReferenceListMixin,
+                      mixins.ListModelMixin,
                       mixins.CreateModelMixin,
                       mixins.DestroyModelMixin,
                       viewsets.GenericViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    reference_table = reference.categories
+    query_budget = {'list': 1}
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    version_names = ('categories',)
 
 
-class GenreViewSet(mixins.ListModelMixin,
+class GenreViewSet(ConditionalGetMixin,
+                   SparseFieldsMixin,
+                   ReferenceListMixin,
+                   mixins.ListModelMixin,
                    mixins.CreateModelMixin,
                    mixins.DestroyModelMixin,
                    viewsets.GenericViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    reference_table = reference.genres
+    query_budget = {'list': 1}
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    version_names = ('genres',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score',))
+class TitleViewSet(ExpandMixin, ObjectCacheMixin, MultiGetMixin,
+                   CachedListMixin, SparseFieldsMixin, FastReadMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     serializer_class = TitleSerializer
+    row_builder = TitleRows
+    list_cache_name = 'titles'
+    object_cache_name = 'title'
+    expansions = (REVIEWS, COMMENTS)
+    # В кэше списков хранятся только id, вложенные объекты — на странице.
+    expand_actions = ('retrieve',)
+    query_budget = {'list': 4, 'retrieve': 3}
     permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = KeysetPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitlesFilter
 
+    def get_list_version_names(self, request):
+        names = super().get_list_version_names(request)
+        params = request.query_params
+        if params.get('ordering') == 'rating' or 'rating_min' in params:
+            # Отзывы меняют рейтинг, а с ним состав и порядок страницы.
+            names += ('title-ratings',)
+        return names
+
     def get_serializer_class(self):
         if self.action in ('retrieve', 'list'):
             return ReadOnlyTitleSerializer
         return TitleSerializer
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(MultiGetMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    multi_get_param = 'usernames'
+    query_budget = {'list': 3, 'retrieve': 2}
     permission_classes = (IsAdmin,)
     lookup_field = 'username'
     filter_backends = (filters.SearchFilter,)
@@ -105,9 +152,9 @@ class APIGetToken(APIView):
                 status=status.HTTP_404_NOT_FOUND)
         if default_token_generator.check_token(user,
                                                data['confirmation_code']):
-            token = AccessToken.for_user(user)
+            token = issue_access_token(user)
             return Response(
-                {'token': token},
+                {'token': str(token)},
                 status=status.HTTP_201_CREATED
             )
         return Response(
@@ -122,7 +169,7 @@ class APISignup(APIView):
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user, _ = User.objects.get_or_create(**serializer.validated_data)
+        user = serializer.save()
         confirmation_code = default_token_generator.make_token(user)
         email_body = (
             f'Доброе время суток, {user.username}.'
@@ -134,43 +181,114 @@ class APISignup(APIView):
             'recipient_list': (user.email,),
             'subject': 'Код подтверждения для доступа к API!'
         }
-        send_mail(**data)
+        if settings.SIGNUP_EMAIL_OUTBOX:
+            queue_mail(**data)
+        else:
+            send_mail(**data)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class APIExport(APIView):
+    permission_classes = (IsAdmin,)
+    content_types = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+    }
+
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            return Response(
+                {'dataset': f'Доступны: {", ".join(DATASETS)}.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        output_format = request.query_params.get('output', 'csv')
+        if output_format not in FORMATS:
+            return Response(
+                {'output': f'Доступны: {", ".join(FORMATS)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        response = StreamingHttpResponse(
+            export(dataset, output_format),
+            content_type=self.content_types[output_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset}.{output_format}"'
+        )
+        return response
+
+
+class APIBatch(APIView):
+    """Несколько запросов к API одним POST.
+
+    Подзапросы проходят через те же вьюсеты с авторизацией вызывающего,
+    права проверяются у каждого подзапроса отдельно.
+    """
+    permission_classes = (AllowAny,)
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        return Response({
+            'responses': run_batch(request, data['requests'], data['parallel'])
+        })
+
+
+class ReviewViewSet(ConditionalRetrieveMixin, MultiGetMixin, ExpandMixin,
+                    SparseFieldsMixin, FastReadMixin, TitleNestedMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    row_builder = ReviewRows
+    expansions = (COMMENTS,)
     permission_classes = (IsAdminModeratorOwnerOrReadOnly,)
+    query_budget = {'list': 3, 'retrieve': 2}
+    pagination_class = KeysetPagination
+
+    version_names = ('reviews:{title_id}', 'users')
+
+    def get_version_names(self):
+        names = super().get_version_names()
+        if self.expand_depth:
+            names += ('comments',)
+        return names
 
-    def get_serializer_context(self):
-        context = super(ReviewViewSet, self).get_serializer_context()
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        context.update({'title': title})
-        return context
+    # Изменение и удаление читают отзыв с блокировкой строки до конца
+    # транзакции: сигналы пересчитывают рейтинг от оценки, сохранённой
+    # в БД, а не от прочитанной до параллельного PATCH.
+    locked_actions = ('update', 'partial_update', 'destroy')
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        return title.reviews.all()
+        queryset = self.title.reviews.select_related('author')
+        if self.action in self.locked_actions:
+            queryset = queryset.select_for_update()
+        return queryset
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        serializer.save(author=self.request.user, title=title)
-        return title.reviews.all()
+        serializer.save(author_id=self.request.user.pk, title=self.title)
 
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
 
-class CommentViewSet(viewsets.ModelViewSet):
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().destroy(request, *args, **kwargs)
+
+
+class CommentViewSet(ConditionalRetrieveMixin, SparseFieldsMixin,
+                     FastReadMixin, ReviewNestedMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    row_builder = CommentRows
     permission_classes = (IsAdminModeratorOwnerOrReadOnly,)
+    query_budget = {'list': 3, 'retrieve': 2}
+    pagination_class = KeysetPagination
     http_method_names = ('get', 'post', 'patch', 'delete')
 
+    version_names = ('comments:{review_id}', 'users')
+
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return self.review.comments.select_related('author')
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author_id=self.request.user.pk, review=self.review)
@@ -27,8 +27,8 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'django_filters',
 
-    'reviews',
-    'api',
+    'reviews.apps.ReviewsConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
@@ -73,6 +73,54 @@ DATABASES = {
 
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
+# Счётчики версий в кэше сбрасывают кэши и справочники всех процессов,
+# поэтому кэш общий. Поддерживаемый общий кэш — Memcached
+# (MEMCACHED_LOCATION, например 127.0.0.1:11211): атомарные операции
+# и вытеснение без обхода всех ключей. Без него — файловый кэш
+# в каталоге CACHE_LOCATION для разработки на одной машине: каждая
+# запись в нём перебирает файлы каталога.
+if os.environ.get('MEMCACHED_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': os.environ['MEMCACHED_LOCATION'].split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get(
+                'CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')
+            ),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Время жизни закэшированных страниц списков, сек.
+LIST_CACHE_TIMEOUT = 300
+# Время жизни закэшированных представлений отдельных объектов, сек.
+OBJECT_CACHE_TIMEOUT = 3600
+# Справочники категорий и жанров в памяти процесса перечитываются
+# не реже чем раз в столько секунд, даже если версия не менялась.
+REFERENCE_TABLE_TTL = 60
+# Счётчики версий живут не дольше этого; новый счётчик после истечения
+# сбрасывает кэши и ETag, даже если чья-то запись его не изменила.
+CACHE_VERSION_TIMEOUT = 24 * 60 * 60
+
+# Число вложенных объектов на родителя для ?expand= по умолчанию
+# и наибольшее значение параметров reviews_limit и comments_limit.
+EXPAND_DEFAULT_LIMIT = 5
+EXPAND_MAX_LIMIT = 50
+
+# Наибольшее число значений в ?ids= и ?usernames= одного запроса.
+MULTI_GET_MAX_SIZE = 100
+
+# Наибольшее число подзапросов в /api/v1/batch/ и потоков для
+# параллельного выполнения чтений ("parallel": true).
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -116,24 +164,44 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 DEFAULT_FROM_EMAIL = 'admin@yamdb.com'
 
+# Письма с кодом подтверждения: при True они складываются в EmailOutbox
+# и отправляются командой `python manage.py send_outbox`.
+SIGNUP_EMAIL_OUTBOX = False
+# Письмо того же вида тому же получателю не чаще, чем раз в столько секунд.
+EMAIL_OUTBOX_DEDUP_WINDOW = 300
+EMAIL_OUTBOX_RETRY_DELAY = 60
+# На столько секунд обработчик забирает пачку писем; если он упадёт,
+# письма вернутся в очередь после этого срока.
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.RoleClaimsJWTAuthentication",
     ],
 
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.'
-                                'PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.EstimatedCountPagination',
     "PAGE_SIZE": 10,
 }
 
+# До этого числа строк count в списках точный, выше — оценка планировщика
+# или закэшированное на PAGINATION_COUNT_CACHE_TIMEOUT секунд значение.
+PAGINATION_EXACT_COUNT_LIMIT = 1000
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# При True токен из /auth/token/ содержит username, роль и флаг суперюзера,
+# и пользователь не загружается из БД на каждый запрос.
+# Смена роли учитывается не позже чем через JWT_ROLE_CLAIMS_TTL секунд.
+JWT_ROLE_CLAIMS = False
+JWT_ROLE_CLAIMS_TTL = 60
+
 
 # email settings
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
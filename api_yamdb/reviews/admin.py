@@ -9,6 +9,7 @@ from django.contrib.auth.admin import UserAdmin, User
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 from import_export.fields import Field
+from reviews.paginator import EstimatedCountPaginator
 
 
 class UserResource(resources.ModelResource):
@@ -55,6 +56,7 @@ class CategoryResource(resources.ModelResource):
     class Meta:
         model = Category
         fields = ('id', 'name', 'slug')
+        skip_unchanged = True
 
 
 class CategoryAdmin(ImportExportModelAdmin):
@@ -87,6 +89,8 @@ class CommentResource(resources.ModelResource):
 
 class CommentAdmin(ImportExportModelAdmin):
     resource_classes = [CommentResource]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_display = (
         'id',
         'review_id',
@@ -105,6 +109,7 @@ class GenreResource(resources.ModelResource):
     class Meta:
         model = Genre
         fields = ('id', 'name', 'slug')
+        skip_unchanged = True
 
 
 class GenreAdmin(ImportExportModelAdmin):
@@ -137,6 +142,8 @@ class ReviewResource(resources.ModelResource):
 
 class ReviewAdmin(ImportExportModelAdmin):
     resource_classes = [ReviewResource]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_display = (
         'id',
         'title',
@@ -161,6 +168,7 @@ class TitleResource(resources.ModelResource):
             'category',
             'description',
         )
+        skip_unchanged = True
 
 
 class TitleAdmin(ImportExportModelAdmin):
@@ -175,18 +183,20 @@ class TitleAdmin(ImportExportModelAdmin):
     search_fields = ('name',)
     list_filter = ('name',)
     exclude = ('genres',)
+    readonly_fields = ('rating', 'rating_sum', 'rating_count')
     empty_value_display = '-пусто-'
 
 
 class GenreTitleResource(resources.ModelResource):
 
     class Meta:
-        model = Genre
+        model = GenreTitle
         fields = (
             'id',
             'title_id',
             'genre_id',
         )
+        skip_unchanged = True
 
 
 class GenreTitleAdmin(ImportExportModelAdmin):
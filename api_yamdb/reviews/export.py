@@ -0,0 +1,117 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, GenreTitle, Review, Title
+
+EXPORT_CHUNK_SIZE = 2000
+
+FIELDS = {
+    'titles': (
+        'id', 'name', 'year', 'description', 'category', 'genre', 'rating'
+    ),
+    'reviews': ('id', 'title_id', 'author', 'text', 'score', 'pub_date'),
+    'comments': ('id', 'review_id', 'author', 'text', 'pub_date'),
+}
+
+FORMATS = ('csv', 'ndjson')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_titles(chunk_size):
+    """Произведения со слагами категории и жанров, по пачкам."""
+    titles = Title.objects.order_by('id').values_list(
+        'id', 'name', 'year', 'description', 'category__slug', 'rating'
+    ).iterator(chunk_size=chunk_size)
+    for chunk in chunked(titles, chunk_size):
+        genres = {}
+        for title_id, slug in GenreTitle.objects.filter(
+            title_id__in=[row[0] for row in chunk]
+        ).order_by('title_id', 'genre__slug').values_list(
+            'title_id', 'genre__slug'
+        ):
+            genres.setdefault(title_id, []).append(slug)
+        for title_id, name, year, description, category, rating in chunk:
+            yield {
+                'id': title_id,
+                'name': name,
+                'year': year,
+                'description': description,
+                'category': category,
+                'genre': genres.get(title_id, []),
+                'rating': rating,
+            }
+
+
+def iter_values(queryset, fields, chunk_size):
+    for row in queryset.order_by('id').values_list(*fields).iterator(
+        chunk_size=chunk_size
+    ):
+        yield row
+
+
+def iter_reviews(chunk_size):
+    rows = iter_values(
+        Review.objects.all(),
+        ('id', 'title_id', 'author__username', 'text', 'score', 'pub_date'),
+        chunk_size
+    )
+    for row in rows:
+        yield dict(zip(FIELDS['reviews'], row))
+
+
+def iter_comments(chunk_size):
+    rows = iter_values(
+        Comment.objects.all(),
+        ('id', 'review_id', 'author__username', 'text', 'pub_date'),
+        chunk_size
+    )
+    for row in rows:
+        yield dict(zip(FIELDS['comments'], row))
+
+
+DATASETS = {
+    'titles': iter_titles,
+    'reviews': iter_reviews,
+    'comments': iter_comments,
+}
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу отдаёт записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            ','.join(value) if isinstance(value, list) else value
+            for value in (row[field] for field in fields)
+        )
+
+
+def render_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder) + '\n'
+
+
+def export(dataset, output_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Генератор строк выгрузки; память не растёт с размером таблицы."""
+    rows = DATASETS[dataset](chunk_size)
+    if output_format == 'csv':
+        return render_csv(rows, FIELDS[dataset])
+    return render_ndjson(rows)
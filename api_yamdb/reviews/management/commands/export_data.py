@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from reviews.export import DATASETS, EXPORT_CHUNK_SIZE, FORMATS, export
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает произведения, отзывы или комментарии.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=DATASETS)
+        parser.add_argument(
+            '--output-format', choices=FORMATS, default='csv'
+        )
+        parser.add_argument(
+            '--file', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        lines = export(
+            options['dataset'], options['output_format'],
+            options['chunk_size']
+        )
+        if not options['file']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['file'], 'w', encoding='utf-8',
+                  newline='') as output:
+            output.writelines(lines)
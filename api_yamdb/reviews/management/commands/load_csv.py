@@ -0,0 +1,292 @@
+import csv
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+
+from reviews import search
+from reviews.models import (CSV_DATETIME_FORMAT, Category, Comment,
+                            ContentHashModel, Genre, GenreTitle, Review, Title,
+                            User)
+
+
+def parse_datetime(value):
+    """Разбирает дату из CSV; fromisoformat в разы быстрее strptime."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.rstrip('Z'))
+    except ValueError:
+        parsed = datetime.strptime(value, CSV_DATETIME_FORMAT)
+    return parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_text(value):
+    return value or ''
+
+
+def parse_null(value):
+    return value or None
+
+
+def is_model(parse):
+    return isinstance(parse, type) and issubclass(parse, models.Model)
+
+
+# Файл, модель и столбцы: имя в CSV -> (атрибут модели, преобразование).
+# Для внешних ключей вместо преобразования указана связанная модель.
+TABLES = (
+    ('users.csv', User, {
+        'id': ('id', int),
+        'username': ('username', str),
+        'email': ('email', str),
+        'role': ('role', str),
+        'bio': ('bio', parse_null),
+        'first_name': ('first_name', parse_text),
+        'last_name': ('last_name', parse_text),
+    }),
+    ('category.csv', Category, {
+        'id': ('id', int),
+        'name': ('name', str),
+        'slug': ('slug', str),
+    }),
+    ('genre.csv', Genre, {
+        'id': ('id', int),
+        'name': ('name', str),
+        'slug': ('slug', str),
+    }),
+    ('titles.csv', Title, {
+        'id': ('id', int),
+        'name': ('name', str),
+        'year': ('year', int),
+        'description': ('description', parse_null),
+        'category': ('category_id', Category),
+    }),
+    ('genre_title.csv', GenreTitle, {
+        'id': ('id', int),
+        'title_id': ('title_id', Title),
+        'genre_id': ('genre_id', Genre),
+    }),
+    ('review.csv', Review, {
+        'id': ('id', int),
+        'title': ('title_id', Title),
+        'author': ('author_id', User),
+        'text': ('text', str),
+        'score': ('score', int),
+        'pub_date': ('pub_date', parse_datetime),
+    }),
+    ('comments.csv', Comment, {
+        'id': ('id', int),
+        'review_id': ('review_id', Review),
+        'author': ('author_id', User),
+        'text': ('text', str),
+        'pub_date': ('pub_date', parse_datetime),
+    }),
+)
+
+# Необязательные внешние ключи: при отсутствии связи остаются пустыми.
+NULLABLE = {'category_id'}
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Не даёт auto_now_add перезаписать даты из CSV при bulk_create."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Быстро загружает CSV-файлы из static/data через bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            metavar='FILE',
+            help='Загрузить только указанные файлы, например titles.csv.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts',
+            action='store_true',
+            help='Пропускать строки с уже существующими id.'
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Синхронизировать каталог: записать только добавленные, '
+                 'изменённые и удалённые строки.'
+        )
+
+    def handle(self, *args, **options):
+        id_maps = {}
+        for filename, model, columns in TABLES:
+            if options['only'] and filename not in options['only']:
+                continue
+            path = os.path.join(options['path'], filename)
+            if not os.path.exists(path):
+                raise CommandError(f'Файл {path} не найден.')
+            if options['sync'] and not issubclass(model, ContentHashModel):
+                continue
+            for _, related in columns.values():
+                if is_model(related) and related not in id_maps:
+                    id_maps[related] = set(
+                        related.objects.values_list('id', flat=True)
+                    )
+            started = time.perf_counter()
+            if options['sync']:
+                report = self.sync_file(path, model, columns, id_maps, options)
+                # После удалений набор id нужно перечитать из БД.
+                id_maps.pop(model, None)
+            else:
+                loaded, skipped, ids = self.load_file(
+                    path, model, columns, id_maps, options
+                )
+                if model in id_maps:
+                    id_maps[model] |= ids
+                elapsed = max(time.perf_counter() - started, 1e-9)
+                report = (
+                    f'{loaded} строк за {elapsed:.2f} с '
+                    f'({loaded / elapsed:.0f} строк/с), пропущено {skipped}'
+                )
+            self.stdout.write(f'{filename}: {report}')
+        self.refresh_derived(options)
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена.'))
+
+    @staticmethod
+    def refresh_derived(options):
+        """Обновляет то, что обычно поддерживают сигналы моделей."""
+        def loaded(filename):
+            return not options['only'] or filename in options['only']
+
+        if not options['sync'] and loaded('review.csv'):
+            Title.objects.rebuild_rating()
+        if loaded('titles.csv'):
+            search.rebuild_index()
+        # bulk_create и bulk_update не вызывают сигналы, поэтому счётчики
+        # версий не менялись: сбрасываем кэш вместе с ними.
+        cache.clear()
+
+    def load_file(self, path, model, columns, id_maps, options):
+        loaded = skipped = 0
+        ids = set()
+        batch = []
+        with open(path, encoding='utf-8', newline='') as csv_file, \
+                transaction.atomic(), keep_auto_now_add(model):
+            for row in csv.DictReader(csv_file):
+                values = self.convert(row, columns, id_maps)
+                if values is None:
+                    skipped += 1
+                    continue
+                batch.append(self.build(model, values))
+                ids.add(values['id'])
+                if len(batch) >= options['batch_size']:
+                    loaded += self.flush(model, batch, options)
+            loaded += self.flush(model, batch, options)
+            self.reset_sequence(model)
+        return loaded, skipped, ids
+
+    def sync_file(self, path, model, columns, id_maps, options):
+        """Пишет в БД только отличия CSV от сохранённых хэшей строк."""
+        existing = dict(model.objects.values_list('id', 'content_hash'))
+        fields = [*model.hash_fields, 'content_hash']
+        batch_size = options['batch_size']
+        created, updated = [], []
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        with open(path, encoding='utf-8', newline='') as csv_file, \
+                transaction.atomic():
+            for row in csv.DictReader(csv_file):
+                values = self.convert(row, columns, id_maps)
+                if values is None:
+                    counts['skipped'] += 1
+                    continue
+                obj = self.build(model, values)
+                old_hash = existing.pop(obj.id, None)
+                if old_hash is None:
+                    created.append(obj)
+                elif old_hash != obj.content_hash:
+                    updated.append(obj)
+                else:
+                    counts['unchanged'] += 1
+                if len(created) >= batch_size:
+                    counts['created'] += self.flush(model, created, options)
+                if len(updated) >= batch_size:
+                    model.objects.bulk_update(updated, fields)
+                    counts['updated'] += len(updated)
+                    updated.clear()
+            counts['created'] += self.flush(model, created, options)
+            model.objects.bulk_update(updated, fields)
+            counts['updated'] += len(updated)
+            stale = list(existing)
+            for start in range(0, len(stale), batch_size):
+                model.objects.filter(
+                    id__in=stale[start:start + batch_size]
+                ).delete()
+            self.reset_sequence(model)
+        return (
+            f'+{counts["created"]} ~{counts["updated"]} -{len(stale)}, '
+            f'без изменений {counts["unchanged"]}, '
+            f'пропущено {counts["skipped"]}'
+        )
+
+    @staticmethod
+    def build(model, values):
+        obj = model(**values)
+        if isinstance(obj, ContentHashModel):
+            obj.content_hash = obj.get_content_hash()
+        return obj
+
+    @staticmethod
+    def convert(row, columns, id_maps):
+        values = {}
+        for column, (attname, parse) in columns.items():
+            if column not in row:
+                continue
+            value = row[column]
+            if is_model(parse):
+                value = int(value) if value else None
+                if value not in id_maps[parse]:
+                    if attname not in NULLABLE:
+                        return None
+                    value = None
+            else:
+                value = parse(value)
+            values[attname] = value
+        return values
+
+    @staticmethod
+    def flush(model, batch, options):
+        count = len(batch)
+        if count:
+            model.objects.bulk_create(
+                batch, ignore_conflicts=options['ignore_conflicts']
+            )
+            batch.clear()
+        return count
+
+    @staticmethod
+    def reset_sequence(model):
+        statements = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,35 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает или проверяет сохранённые рейтинги произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Только проверить рейтинги, ничего не изменяя.'
+        )
+
+    def handle(self, *args, **options):
+        if not options['verify']:
+            updated = Title.objects.rebuild_rating()
+            # UPDATE в обход сигналов: закэшированные ответы API устарели.
+            cache.clear()
+            self.stdout.write(
+                self.style.SUCCESS(f'Пересчитано произведений: {updated}')
+            )
+            return
+        stale = Title.objects.stale_rating().order_by('pk')
+        for title in stale.only('id', 'rating_sum', 'rating_count'):
+            self.stdout.write(
+                f'{title.pk}: сохранено {title.rating_sum}/'
+                f'{title.rating_count}, по отзывам '
+                f'{title.actual_sum}/{title.actual_count}'
+            )
+        if stale.exists():
+            raise CommandError('Найдены расхождения в рейтингах.')
+        self.stdout.write(self.style.SUCCESS('Рейтинги совпадают с отзывами.'))
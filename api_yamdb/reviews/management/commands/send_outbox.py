@@ -0,0 +1,40 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import send_outbox_batch
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди EmailOutbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval сек.'
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        with get_connection() as connection:
+            while True:
+                sent, failed = send_outbox_batch(
+                    connection,
+                    options['batch_size'],
+                    options['max_attempts'],
+                )
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено: {total_sent}, с ошибкой: {total_failed}'
+        ))
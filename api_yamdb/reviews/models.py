@@ -1,8 +1,11 @@
 import datetime
+import hashlib
 
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
 
 from .validators import username_validate, validate_year
 
@@ -58,8 +61,37 @@ class User(AbstractUser):
         verbose_name = 'Пользователь'
 
 
-class CategoryGenre(models.Model):
+class ContentHashModel(models.Model):
+    """Модель каталога с хэшем содержимого для синхронизации с CSV."""
+    hash_fields = ()
+
+    content_hash = models.CharField(
+        max_length=40,
+        blank=True,
+        editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+    def get_content_hash(self):
+        values = '\x1f'.join(
+            str(getattr(self, field)) for field in self.hash_fields
+        )
+        return hashlib.sha1(values.encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.get_content_hash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'content_hash'}
+        super().save(*args, **kwargs)
+
+
+class CategoryGenre(ContentHashModel):
     """Категория и жанр произведения."""
+    hash_fields = ('name', 'slug')
+
     name = models.CharField(
         max_length=200
     )
@@ -78,6 +110,9 @@ class Category(CategoryGenre):
     class Meta:
         verbose_name = 'Категория'
         ordering = ('name',)
+        indexes = (
+            models.Index(fields=('name',), name='category_name_idx'),
+        )
 
     def __str__(self):
         return self.name
@@ -89,13 +124,60 @@ class Genre(CategoryGenre):
     class Meta:
         verbose_name = 'Жанр'
         ordering = ('name',)
+        indexes = (
+            models.Index(fields=('name',), name='genre_name_idx'),
+        )
 
     def __str__(self):
         return self.name
 
 
-class Title(models.Model):
+class TitleQuerySet(models.QuerySet):
+
+    def _review_aggregate(self, aggregate):
+        reviews = Review.objects.filter(
+            title=models.OuterRef('pk')
+        ).order_by().values('title')
+        return models.Subquery(
+            reviews.annotate(value=aggregate).values('value'),
+            output_field=models.IntegerField()
+        )
+
+    def _actual_sum(self):
+        return Coalesce(self._review_aggregate(models.Sum('score')), 0)
+
+    def _actual_count(self):
+        return Coalesce(self._review_aggregate(models.Count('id')), 0)
+
+    def with_actual_rating(self):
+        """Добавляет агрегат рейтинга, посчитанный по таблице отзывов."""
+        return self.annotate(
+            actual_sum=self._actual_sum(),
+            actual_count=self._actual_count()
+        )
+
+    def stale_rating(self):
+        """Произведения, у которых сохранённый рейтинг разошёлся с отзывами."""
+        return self.with_actual_rating().exclude(
+            rating_sum=models.F('actual_sum'),
+            rating_count=models.F('actual_count')
+        )
+
+    def rebuild_rating(self):
+        """Пересчитывает сохранённый рейтинг по таблице отзывов."""
+        return self.update(
+            rating_sum=self._actual_sum(),
+            rating_count=self._actual_count(),
+            rating=self._review_aggregate(
+                models.Sum('score') / models.Count('id')
+            )
+        )
+
+
+class Title(ContentHashModel):
     """Конкретный объект."""
+    hash_fields = ('name', 'year', 'description', 'category_id')
+
     name = models.CharField(
         max_length=200
     )
@@ -115,22 +197,64 @@ class Title(models.Model):
         Category,
         on_delete=models.SET_NULL,
         related_name='titles',
-        null=True
+        null=True,
+        db_index=False
+    )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.IntegerField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False
     )
 
+    objects = TitleQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Произведение'
-        ordering = ('name',)
+        ordering = ('name', 'id')
+        indexes = (
+            models.Index(fields=('name', 'id'), name='title_name_idx'),
+            models.Index(fields=('category', 'year'),
+                         name='title_category_year_idx'),
+            # Сортировки ?ordering=year|newest|rating и диапазоны
+            # year_min/year_max, rating_min.
+            models.Index(fields=('year', 'id'), name='title_year_idx'),
+            models.Index(fields=('-rating', 'id'), name='title_rating_idx'),
+        )
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def shift_rating(title_id, score_delta, count_delta):
+        """Атомарно сдвигает агрегат рейтинга одним UPDATE."""
+        rating_sum = models.F('rating_sum') + score_delta
+        rating_count = models.F('rating_count') + count_delta
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=rating_sum / NullIf(rating_count, 0)
+        )
+
+
+class GenreTitle(ContentHashModel):
+    hash_fields = ('title_id', 'genre_id')
 
-class GenreTitle(models.Model):
     title = models.ForeignKey(
         Title,
         verbose_name='Произведение',
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
     genre = models.ForeignKey(
         Genre,
@@ -140,6 +264,14 @@ class GenreTitle(models.Model):
 
     class Meta:
         verbose_name = 'Произведение и жанр'
+        constraints = (
+            models.UniqueConstraint(fields=('title', 'genre'),
+                                    name='unique_genre_title'),
+        )
+        indexes = (
+            models.Index(fields=('genre', 'title'),
+                         name='genretitle_genre_title_idx'),
+        )
 
     def __str__(self):
         return f'{self.title}, жанр - {self.genre}'
@@ -161,7 +293,8 @@ class Review(DatePubText):
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
-        related_name='reviews'
+        related_name='reviews',
+        db_index=False
     )
     author = models.ForeignKey(
         User,
@@ -180,7 +313,24 @@ class Review(DatePubText):
     )
 
     class Meta:
+        verbose_name = 'Отзыв'
+        ordering = ('pub_date', 'id')
         unique_together = ('author', 'title')
+        indexes = (
+            models.Index(fields=('title', 'pub_date', 'id'),
+                         name='review_title_pub_date_idx'),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_score()
+        return instance
+
+    def remember_score(self):
+        """Запоминает оценку, уже учтённую в рейтинге произведения."""
+        self._counted_title_id = self.__dict__.get('title_id')
+        self._counted_score = self.__dict__.get('score')
 
     @property
     def csv_pub_date(self):
@@ -198,7 +348,8 @@ class Comment(DatePubText):
     review = models.ForeignKey(
         Review,
         on_delete=models.CASCADE,
-        related_name='comments'
+        related_name='comments',
+        db_index=False
     )
     author = models.ForeignKey(
         User,
@@ -208,7 +359,11 @@ class Comment(DatePubText):
 
     class Meta:
         verbose_name = 'Комментарий'
-        ordering = ('pub_date',)
+        ordering = ('pub_date', 'id')
+        indexes = (
+            models.Index(fields=('review', 'pub_date', 'id'),
+                         name='comment_review_pub_date_idx'),
+        )
 
     @property
     def csv_pub_date(self):
@@ -219,3 +374,30 @@ class Comment(DatePubText):
         if value:
             self.pub_date = datetime.datetime.strptime(value,
                                                        CSV_DATETIME_FORMAT)
+
+
+class EmailOutbox(models.Model):
+    """Письмо, ожидающее отправки фоновым обработчиком."""
+    recipient = models.EmailField('Получатель')
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель')
+    # Хэш получателя и вида письма: одна строка на пару, повторное
+    # письмо заменяет её не раньше EMAIL_OUTBOX_DEDUP_WINDOW секунд.
+    dedup_key = models.CharField(max_length=40, unique=True, editable=False)
+    created = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        ordering = ('id',)
+        indexes = (
+            models.Index(fields=('sent_at', 'send_after'),
+                         name='outbox_pending_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
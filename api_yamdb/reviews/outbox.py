@@ -0,0 +1,109 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+
+def queue_mail(subject, message, from_email, recipient_list, kind=None):
+    """Ставит письмо в очередь.
+
+    На получателя и вид письма (по умолчанию — тему) в очереди одна
+    строка. Повторное письмо в течение EMAIL_OUTBOX_DEDUP_WINDOW секунд
+    после предыдущего отбрасывается, позже — заменяет его.
+    """
+    now = timezone.now()
+    window_start = now - timedelta(seconds=settings.EMAIL_OUTBOX_DEDUP_WINDOW)
+    fields = {
+        'subject': subject,
+        'body': message,
+        'from_email': from_email,
+        'created': now,
+        'send_after': now,
+        'sent_at': None,
+        'attempts': 0,
+        'last_error': '',
+    }
+    for recipient in recipient_list:
+        dedup_key = hashlib.sha1(
+            f'{recipient}\n{kind or subject}'.encode()
+        ).hexdigest()
+        # Условие в UPDATE проверяется атомарно: из одновременных
+        # запросов строку заменит только один.
+        if EmailOutbox.objects.filter(
+            dedup_key=dedup_key, created__lt=window_start
+        ).update(**fields):
+            continue
+        EmailOutbox.objects.bulk_create(
+            [EmailOutbox(recipient=recipient, dedup_key=dedup_key, **fields)],
+            ignore_conflicts=True
+        )
+
+
+def claim_batch(batch_size, max_attempts):
+    """Забирает пачку писем короткой транзакцией.
+
+    Взятые письма откладываются на EMAIL_OUTBOX_CLAIM_TIMEOUT секунд:
+    их не возьмёт другой обработчик, пока этот отправляет их без
+    открытой транзакции.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                attempts__lt=max_attempts,
+                send_after__lte=now,
+            )[:batch_size]
+        )
+        EmailOutbox.objects.filter(
+            pk__in=[item.pk for item in batch]
+        ).update(
+            attempts=F('attempts') + 1,
+            send_after=now + timedelta(
+                seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+            ),
+        )
+    for item in batch:
+        item.attempts += 1
+    return batch
+
+
+def send_outbox_batch(connection, batch_size, max_attempts):
+    """Отправляет одну пачку писем через открытое соединение.
+
+    Возвращает пару (отправлено, с ошибкой).
+    """
+    batch = claim_batch(batch_size, max_attempts)
+    sent = 0
+    for item in batch:
+        message = EmailMessage(
+            subject=item.subject,
+            body=item.body,
+            from_email=item.from_email,
+            to=(item.recipient,),
+            connection=connection,
+        )
+        try:
+            message.send()
+        except Exception as error:
+            fields = {
+                'last_error': repr(error),
+                'send_after': timezone.now() + timedelta(
+                    seconds=settings.EMAIL_OUTBOX_RETRY_DELAY
+                    * 2 ** (item.attempts - 1)
+                ),
+            }
+        else:
+            fields = {'sent_at': timezone.now(), 'last_error': ''}
+            sent += 1
+        # Письмо, заменённое новым во время отправки, остаётся в очереди.
+        EmailOutbox.objects.filter(
+            pk=item.pk, created=item.created
+        ).update(**fields)
+    return sent, len(batch) - sent
@@ -0,0 +1,76 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import AutoField, Max, Min, QuerySet
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset):
+    """Оценка числа строк или None, если её нет.
+
+    В PostgreSQL оценку даёт EXPLAIN. У SQLite статистики для этого нет,
+    поэтому оценивается только выборка без условий: по диапазону
+    id, двумя поисками по первичному ключу.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return estimate_from_pk_range(queryset)
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_from_pk_range(queryset):
+    query = queryset.query
+    # Срез (can_filter() ложно) и DISTINCT тоже меняют число строк.
+    filtered = query.where or query.distinct or not query.can_filter()
+    if filtered or not isinstance(queryset.model._meta.pk, AutoField):
+        return None
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['high'] is None:
+        return None
+    return bounds['high'] - bounds['low'] + 1
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, который не считает COUNT(*) по большим выборкам.
+
+    До PAGINATION_EXACT_COUNT_LIMIT строк число точное: счёт ограничен
+    LIMIT и читает не больше этого числа строк. Выше порога берётся
+    оценка (см. estimate_count) или число, сохранённое в кэше при первом
+    точном подсчёте; тогда `approximate` равно True. В SQLite у выборок
+    с условиями оценки нет, и по истечении
+    PAGINATION_COUNT_CACHE_TIMEOUT число снова считается полным COUNT(*).
+    """
+    approximate = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        queryset = self.object_list.order_by()
+        limit = settings.PAGINATION_EXACT_COUNT_LIMIT
+        bounded = queryset.values('pk')[:limit + 1].count()
+        if bounded <= limit:
+            return bounded
+        estimate = estimate_count(queryset)
+        if estimate is not None:
+            self.approximate = True
+            return max(estimate, bounded)
+        sql, params = queryset.query.sql_with_params()
+        key = 'count:' + hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+        count = cache.get(key)
+        if count is not None:
+            self.approximate = True
+            return count
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
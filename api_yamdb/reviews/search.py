@@ -0,0 +1,140 @@
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Title
+
+# Виртуальная таблица FTS5: rowid равен id произведения, название и
+# описание хранятся после casefold (lower() и LIKE в SQLite понимают
+# регистр только у ASCII).
+FTS_TABLE = 'reviews_title_fts'
+# Вес совпадения в названии относительно описания для bm25.
+NAME_WEIGHT = 10.0
+INDEX_CHUNK_SIZE = 2000
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    return (text or '').casefold().replace('ё', 'е')
+
+
+def is_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def create_index(using='default', **kwargs):
+    """Создаёт индекс и перестраивает его, если он разошёлся с таблицей.
+
+    Подключён к post_migrate: срабатывает и после migrate, и после flush.
+    """
+    connection = connections[using]
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+            f'USING fts5(name, description, '
+            f"tokenize='unicode61 remove_diacritics 0', prefix='2 3')"
+        )
+        cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+        indexed = cursor.fetchone()[0]
+    if indexed != Title.objects.using(using).count():
+        rebuild_index(using)
+
+
+def rebuild_index(using='default'):
+    connection = connections[using]
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    rows = Title.objects.using(using).order_by().values_list(
+        'id', 'name', 'description'
+    ).iterator(chunk_size=INDEX_CHUNK_SIZE)
+    index_rows(rows, using)
+
+
+def index_rows(rows, using='default'):
+    """Добавляет в индекс строки (id, name, description)."""
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            f'VALUES (%s, %s, %s)',
+            [
+                (pk, normalize(name), normalize(description))
+                for pk, name, description in rows
+            ]
+        )
+
+
+def index_title(title, using='default'):
+    if not is_supported(connections[using]):
+        return
+    remove_title(title.pk, using)
+    index_rows([(title.pk, title.name, title.description)], using)
+
+
+def remove_title(pk, using='default'):
+    connection = connections[using]
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (pk,))
+
+
+def match_query(text, column=None):
+    """Запрос FTS5: все слова из text как префиксы, или None.
+
+    Каждое слово берётся в кавычки, поэтому синтаксис FTS5 во вводе
+    пользователя не интерпретируется.
+    """
+    words = WORD_RE.findall(normalize(text))
+    if not words:
+        return None
+    query = ' '.join(f'"{word}"*' for word in words)
+    if column is not None:
+        query = f'{column} : ({query})'
+    return query
+
+
+def filter_titles(queryset, text, column=None):
+    """Произведения, в тексте которых есть все слова (как префиксы)."""
+    if not is_supported(connections[queryset.db]):
+        for word in text.split():
+            queryset = queryset.filter(
+                Q(name__icontains=word) if column == 'name'
+                else Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset
+    query = match_query(text, column)
+    if query is None:
+        return queryset.none()
+    # id__in=RawSQL(...) дало бы IN ((SELECT ...)), то есть сравнение
+    # только с первой строкой подзапроса.
+    return queryset.extra(
+        where=(
+            f'"{Title._meta.db_table}"."id" IN (SELECT rowid FROM '
+            f'{FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)',
+        ),
+        params=(query,)
+    )
+
+
+def search_titles(queryset, text):
+    """filter_titles по названию и описанию, самые релевантные первыми.
+
+    Релевантность (bm25, меньше — лучше) доступна как search_rank.
+    """
+    queryset = filter_titles(queryset, text)
+    query = match_query(text)
+    if query is None or not is_supported(connections[queryset.db]):
+        return queryset
+    table = Title._meta.db_table
+    return queryset.annotate(search_rank=RawSQL(
+        f'SELECT bm25({FTS_TABLE}, {NAME_WEIGHT}, 1.0) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+        (query,),
+        output_field=FloatField()
+    )).order_by('search_rank', 'id')
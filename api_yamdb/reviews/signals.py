@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .models import Review, Title
+
+
+@receiver(post_save, sender=Review)
+def count_review_score(sender, instance, created, raw, **kwargs):
+    """Учитывает новую или изменённую оценку в рейтинге произведения."""
+    if raw:
+        return
+    old_title_id = getattr(instance, '_counted_title_id', None)
+    old_score = getattr(instance, '_counted_score', None)
+    if created:
+        Title.shift_rating(instance.title_id, instance.score, 1)
+    elif old_title_id is None or old_score is None:
+        Title.objects.filter(pk=instance.title_id).rebuild_rating()
+    elif old_title_id != instance.title_id:
+        Title.shift_rating(old_title_id, -old_score, -1)
+        Title.shift_rating(instance.title_id, instance.score, 1)
+    elif old_score != instance.score:
+        Title.shift_rating(instance.title_id, instance.score - old_score, 0)
+    instance.remember_score()
+
+
+@receiver(post_delete, sender=Review)
+def discount_review_score(sender, instance, **kwargs):
+    """Убирает оценку удалённого отзыва, в том числе при каскаде."""
+    score = getattr(instance, '_counted_score', None)
+    if score is None:
+        score = instance.score
+    Title.shift_rating(instance.title_id, -score, -1)
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, using, update_fields, **kwargs):
+    """Обновляет строку полнотекстового индекса в той же транзакции."""
+    if update_fields and not {'name', 'description'} & set(update_fields):
+        return
+    search.index_title(instance, using)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, using, **kwargs):
+    search.remove_title(instance.pk, using)
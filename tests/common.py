@@ -1,4 +1,11 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
@@ -113,3 +120,42 @@ def create_comments(admin_client, admin):
     result.append({'id': create_comment(client_moderator, titles[0]["id"], reviews[0]["id"], 'qwerty321'),
                    'author': moderator.username, 'text': 'qwerty321'})
     return result, reviews, titles, user, moderator
+
+
+def assert_query_budget(client, url, viewset, action):
+    """Проверяет, что запрос укладывается в `query_budget` вьюсета.
+
+    Бюджет учитывает все запросы к БД, включая аутентификацию.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+    )
+    budget = viewset.query_budget[action]
+    assert len(queries) <= budget, (
+        f'GET запрос `{url}` выполнил {len(queries)} запросов к БД '
+        f'при бюджете {budget} у `{viewset.__name__}`:\n'
+        + '\n'.join(query['sql'] for query in queries)
+    )
+    return len(queries)
+
+
+def run_in_other_process(code):
+    """Выполняет код в отдельном процессе с настройками проекта.
+
+    Так проверяется, что сброс кэша виден другим воркерам.
+    """
+    subprocess.run(
+        [sys.executable, '-c', f'import django; django.setup(); {code}'],
+        check=True,
+        cwd=os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            'api_yamdb'
+        ),
+        env={
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings',
+            'CACHE_LOCATION': settings.CACHES['default']['LOCATION'],
+        }
+    )
@@ -33,4 +33,5 @@ assert get_version() < '3.8.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_cache',
 ]
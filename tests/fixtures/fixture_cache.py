@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def cache_location(tmp_path_factory):
+    """Кэш тестов во временном каталоге, а не в каталоге dev-сервера."""
+    from django.test.utils import override_settings
+
+    location = str(tmp_path_factory.mktemp('cache'))
+    override = override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': location,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }})
+    override.enable()
+    yield location
+    override.disable()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(cache_location):
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,87 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test08Rating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == 200
+        return response.json()['rating']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_reviews(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 4, (
+            'Проверьте, что `rating` произведения равен средней оценке отзывов'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None, (
+            'Проверьте, что `rating` произведения без отзывов равен `None`'
+        )
+        response = auth_client(user).patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/',
+            data={'score': 10}
+        )
+        assert response.status_code == 200
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что изменение оценки отзыва пересчитывает `rating`'
+        )
+        response = admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        )
+        assert response.status_code == 204
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что удаление отзыва пересчитывает `rating`'
+        )
+        moderator.delete()
+        assert self.get_rating(admin_client, title_id) == 10, (
+            'Проверьте, что каскадное удаление отзывов автора '
+            'пересчитывает `rating`'
+        )
+        user.delete()
+        assert self.get_rating(admin_client, title_id) is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings_command(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        call_command('rebuild_ratings', '--verify')
+        Review.objects.update(score=1)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--verify')
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--verify')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (3, 3, 1)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_locked_review_writes(self, admin_client, admin, monkeypatch):
+        from django.db import connection
+
+        from api.views import ReviewViewSet
+
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        locks = []
+        get_object = ReviewViewSet.get_object
+
+        def spy(view):
+            locks.append((
+                connection.in_atomic_block,
+                view.get_queryset().query.select_for_update
+            ))
+            return get_object(view)
+
+        monkeypatch.setattr(ReviewViewSet, 'get_object', spy)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/'
+        assert auth_client(user).patch(
+            url, data={'score': 10}
+        ).status_code == 200
+        assert admin_client.delete(url).status_code == 204
+        assert locks == [(True, True), (True, True)], (
+            'Проверьте, что изменение и удаление отзыва читают его '
+            'с блокировкой строки в транзакции'
+        )
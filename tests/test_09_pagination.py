@@ -0,0 +1,94 @@
+import base64
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+class Test09KeysetPagination:
+
+    def walk(self, client, url, direction='next'):
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+            )
+            assert not any('COUNT(' in q['sql'] for q in queries), (
+                'Проверьте, что курсорная пагинация не выполняет `COUNT(*)`'
+            )
+            data = response.json()
+            assert 'count' not in data
+            pages.append([item['id'] for item in data['results']])
+            url = data[direction]
+        return pages
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client):
+        from reviews.models import Title
+
+        for i in range(23):
+            Title.objects.create(name=f'Произведение {i % 4}', year=2000)
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True)
+        )
+        pages = self.walk(client, '/api/v1/titles/?cursor=')
+        assert [len(page) for page in pages] == [10, 10, 3]
+        assert sum(pages, []) == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` отдаёт '
+            'произведения по порядку `name, id` без пропусков и повторов'
+        )
+
+        response = client.get('/api/v1/titles/?cursor=')
+        last_url = client.get(response.json()['next']).json()['next']
+        last = client.get(last_url).json()
+        back = self.walk(client, last['previous'], direction='previous')
+        assert sum(reversed(back), []) == expected[:20], (
+            'Проверьте ссылку `previous` курсорной пагинации'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_comments_cursor(self, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        pages = self.walk(admin_client, f'{url}?cursor=')
+        assert pages == [[review['id'] for review in reviews]]
+        response = admin_client.get(url)
+        assert response.json()['count'] == len(reviews), (
+            'Проверьте, что без параметра `cursor` пагинация не изменилась'
+        )
+        url = f'{url}{reviews[0]["id"]}/comments/?cursor='
+        pages = self.walk(admin_client, url)
+        assert pages == [[comment['id'] for comment in comments]]
+
+        response = admin_client.get(f'{url}bad')
+        assert response.status_code == 404, (
+            'Проверьте, что при неверном курсоре возвращается статус 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_crafted_cursor(self, client, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        for url in (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+        ):
+            for data in (
+                {'r': 0, 'p': 5},
+                {'r': 0, 'p': ['x', 'y']},
+                {'r': 0, 'p': [['x'], 1]},
+                {'r': 0, 'p': [{'x': 1}, 1]},
+                [1, 2],
+            ):
+                cursor = base64.urlsafe_b64encode(
+                    json.dumps(data).encode()
+                ).decode()
+                response = client.get(f'{url}?cursor={cursor}')
+                assert response.status_code == 404, (
+                    f'Проверьте, что курсор {data} для `{url}` '
+                    'возвращает статус 404'
+                )
@@ -0,0 +1,76 @@
+import pytest
+
+from .common import assert_query_budget, create_comments
+
+
+class Test10QueryBudget:
+
+    def fill(self, title_id, review_id, count):
+        from django.contrib.auth import get_user_model
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title)
+
+        User = get_user_model()
+        for i in range(count):
+            category = Category.objects.create(
+                name=f'Категория {i}', slug=f'category-{i}-{count}'
+            )
+            genre = Genre.objects.create(
+                name=f'Жанр {i}', slug=f'genre-{i}-{count}'
+            )
+            new_title = Title.objects.create(
+                name=f'Произведение {i}', year=2000, category=category
+            )
+            GenreTitle.objects.create(title=new_title, genre=genre)
+            author = User.objects.create(
+                username=f'user-{i}-{count}', email=f'user{i}-{count}@ya.fake'
+            )
+            Review.objects.create(
+                title_id=title_id, author=author, text='Отзыв', score=5
+            )
+            Comment.objects.create(
+                review_id=review_id, author=author, text='Да'
+            )
+
+    def get_endpoints(self, title_id, review_id, comment_id):
+        from api import views
+
+        reviews = f'/api/v1/titles/{title_id}/reviews/'
+        comments = f'{reviews}{review_id}/comments/'
+        return [
+            ('/api/v1/categories/', views.CategoryViewSet, 'list'),
+            ('/api/v1/genres/', views.GenreViewSet, 'list'),
+            ('/api/v1/titles/', views.TitleViewSet, 'list'),
+            ('/api/v1/titles/?cursor=', views.TitleViewSet, 'list'),
+            (f'/api/v1/titles/{title_id}/', views.TitleViewSet, 'retrieve'),
+            (reviews, views.ReviewViewSet, 'list'),
+            (f'{reviews}{review_id}/', views.ReviewViewSet, 'retrieve'),
+            (comments, views.CommentViewSet, 'list'),
+            (f'{comments}{comment_id}/', views.CommentViewSet, 'retrieve'),
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_constant_queries(self, client, admin_client, admin):
+        from api.views import UserViewSet
+
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        endpoints = self.get_endpoints(
+            titles[0]['id'], reviews[0]['id'], comments[0]['id']
+        )
+        endpoints = [(client, *endpoint) for endpoint in endpoints] + [
+            (admin_client, '/api/v1/users/', UserViewSet, 'list'),
+            (admin_client, f'/api/v1/users/{admin.username}/',
+             UserViewSet, 'retrieve'),
+        ]
+        small = [
+            assert_query_budget(*endpoint) for endpoint in endpoints
+        ]
+        self.fill(titles[0]['id'], reviews[0]['id'], 15)
+        large = [
+            assert_query_budget(*endpoint) for endpoint in endpoints
+        ]
+        assert small == large, (
+            'Проверьте, что число запросов к БД не зависит от размера '
+            'страницы: ' + str(list(zip([e[1] for e in endpoints],
+                                        small, large)))
+        )
@@ -0,0 +1,66 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+User = get_user_model()
+
+
+class Test11UserCreateBenchmark:
+    url = '/api/v1/users/'
+
+    def add_users(self, count, start):
+        User.objects.bulk_create(
+            User(username=f'bulk{i}', email=f'bulk{i}@yamdb.fake')
+            for i in range(start, start + count)
+        )
+
+    def create(self, admin_client, name):
+        data = {
+            'username': name,
+            'email': f'{name}@yamdb.fake',
+            'role': 'user',
+        }
+        with CaptureQueriesContext(connection) as captured:
+            response = admin_client.post(self.url, data=data)
+        assert response.status_code == 201
+        return [query['sql'] for query in captured]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_creation_is_flat(self, admin_client,
+                                 django_assert_num_queries):
+        self.add_users(10, 0)
+        small_queries = self.create(admin_client, 'small')
+        self.add_users(2000, 10)
+        with django_assert_num_queries(len(small_queries)):
+            large_queries = self.create(admin_client, 'large')
+
+        user_selects = [
+            sql for sql in large_queries
+            if sql.startswith('SELECT') and 'FROM "reviews_user"' in sql
+        ]
+        assert user_selects and all(
+            'WHERE' in sql for sql in user_selects
+        ), (
+            'Проверьте, что при создании пользователя не загружается '
+            'вся таблица пользователей:\n' + '\n'.join(user_selects)
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_duplicates_still_rejected(self, admin_client, admin):
+        data = {'username': 'fresh', 'email': admin.email}
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 400
+        assert 'email' in response.json()
+        data = {'username': admin.username, 'email': 'fresh@yamdb.fake'}
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что при POST запросе `/api/v1/users/` в формате JSON '
+            'с уже существующим username возвращается статус 400'
+        )
+        response = admin_client.patch(
+            f'{self.url}{admin.username}/', data={'email': admin.email}
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что пользователь может сохранить свой же email'
+        )
@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+def selects_before_write(queries):
+    count = 0
+    for query in queries:
+        sql = query['sql']
+        if sql.startswith(('INSERT', 'UPDATE', 'DELETE')):
+            break
+        if sql.startswith('SELECT'):
+            count += 1
+    return count
+
+
+class Test12WritePaths:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_single_lookup(self, client, admin):
+        data = {'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200
+        assert selects_before_write(queries) <= 1, (
+            'Проверьте, что регистрация выполняет не больше одного запроса '
+            'к БД перед созданием пользователя'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200
+        assert len(queries) == 1, (
+            'Проверьте, что повторная регистрация находит пользователя '
+            'одним запросом'
+        )
+        for data in (
+            {'username': admin.username, 'email': 'other@yamdb.fake'},
+            {'username': 'other', 'email': admin.email},
+        ):
+            response = client.post(self.url_signup, data=data)
+            assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_relies_on_constraint(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Отзыв', 'score': 7}
+        assert admin_client.post(url, data=data).status_code == 201
+        response = admin_client.post(url, data=data)
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Больше одного отзыва оставлять нельзя.']
+        }
+        from reviews.models import Title
+        assert Title.objects.get(pk=titles[0]['id']).rating_count == 1, (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг'
+        )
@@ -0,0 +1,108 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class TransactionCheckingBackend(BaseEmailBackend):
+    in_transaction = []
+
+    def send_messages(self, email_messages):
+        self.in_transaction.append(connection.in_atomic_block)
+        return len(email_messages)
+
+
+class Test13EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+    data = {'username': 'queued', 'email': 'queued@yamdb.fake'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_queues_mail(self, client, settings):
+        from reviews.models import EmailOutbox
+
+        settings.SIGNUP_EMAIL_OUTBOX = True
+        outbox_before_count = len(mail.outbox)
+        for _ in range(3):
+            response = client.post(self.url_signup, data=self.data)
+            assert response.status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при включённой очереди письмо не отправляется '
+            'во время запроса'
+        )
+        assert EmailOutbox.objects.count() == 1, (
+            'Проверьте, что повторные регистрации не дублируют письмо'
+        )
+        call_command('send_outbox')
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == [self.data['email']]
+        assert EmailOutbox.objects.filter(sent_at__isnull=True).count() == 0
+        call_command('send_outbox')
+        assert len(mail.outbox) == outbox_before_count + 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_mail_is_retried(self, client, settings):
+        from reviews.models import EmailOutbox
+
+        settings.SIGNUP_EMAIL_OUTBOX = True
+        settings.EMAIL_BACKEND = 'tests.test_13_email_outbox.FailingBackend'
+        client.post(self.url_signup, data=self.data)
+        call_command('send_outbox')
+        item = EmailOutbox.objects.get()
+        assert item.sent_at is None
+        assert item.attempts == 1
+        assert 'SMTP' in item.last_error
+        assert item.send_after > item.created, (
+            'Проверьте, что повторная отправка откладывается'
+        )
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        EmailOutbox.objects.update(send_after=item.created)
+        call_command('send_outbox')
+        item.refresh_from_db()
+        assert item.sent_at is not None
+        assert item.attempts == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_sliding_dedup_window(self, client, settings):
+        from datetime import timedelta
+
+        from reviews.models import EmailOutbox
+
+        settings.SIGNUP_EMAIL_OUTBOX = True
+        client.post(self.url_signup, data=self.data)
+        call_command('send_outbox')
+        item = EmailOutbox.objects.get()
+        for age, resent in ((200, False), (400, True)):
+            EmailOutbox.objects.update(
+                created=item.created - timedelta(seconds=age)
+            )
+            client.post(self.url_signup, data=self.data)
+            item = EmailOutbox.objects.get()
+            assert (item.sent_at is None) == resent, (
+                'Проверьте, что повторное письмо отбрасывается в течение '
+                'EMAIL_OUTBOX_DEDUP_WINDOW секунд после предыдущего и '
+                'ставится в очередь позже'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_sends_outside_transaction(self, client, settings):
+        from reviews.models import EmailOutbox
+
+        settings.SIGNUP_EMAIL_OUTBOX = True
+        settings.EMAIL_BACKEND = (
+            'tests.test_13_email_outbox.TransactionCheckingBackend'
+        )
+        TransactionCheckingBackend.in_transaction.clear()
+        client.post(self.url_signup, data=self.data)
+        call_command('send_outbox')
+        assert TransactionCheckingBackend.in_transaction == [False], (
+            'Проверьте, что письма отправляются вне транзакции, '
+            'которая забирает их из очереди'
+        )
+        assert EmailOutbox.objects.get().sent_at is not None
@@ -0,0 +1,66 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .common import create_titles
+
+
+class Test14RoleClaims:
+
+    def get_client(self, client, user):
+        data = {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        }
+        response = client.post('/api/v1/auth/token/', data=data)
+        assert response.status_code == 201
+        token_client = APIClient()
+        token_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+        )
+        return token_client
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_no_user_query(self, client, admin, settings):
+        settings.JWT_ROLE_CLAIMS = True
+        admin_client = self.get_client(client, admin)
+        admin_client.get('/api/v1/categories/')
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                '/api/v1/categories/', data={'name': 'Кино', 'slug': 'kino'}
+            )
+        assert response.status_code == 201
+        assert not any('"reviews_user"' in q['sql'] for q in queries), (
+            'Проверьте, что при токене с ролью пользователь не загружается '
+            'из БД на каждый запрос'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_owner_and_role_change(self, client, admin_client, user,
+                                      settings):
+        settings.JWT_ROLE_CLAIMS = True
+        titles, _, _ = create_titles(admin_client)
+        user_client = self.get_client(client, user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'Да', 'score': 5})
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        review_url = f'{url}{response.json()["id"]}/'
+        response = user_client.patch(review_url, data={'score': 6})
+        assert response.status_code == 200, (
+            'Проверьте, что автор может изменить свой отзыв по токену с ролью'
+        )
+        assert user_client.get('/api/v1/users/').status_code == 403
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что после смены роли старый токен не принимается'
+        )
+        user.refresh_from_db()
+        new_client = self.get_client(client, user)
+        assert new_client.get('/api/v1/users/').status_code == 200
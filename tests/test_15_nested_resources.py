@@ -0,0 +1,39 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+class Test15NestedResources:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_review_chain_checked(self, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = (f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        assert admin_client.get(url).status_code == 404, (
+            'Проверьте, что комментарии отзыва недоступны по адресу '
+            'чужого произведения'
+        )
+        assert admin_client.get(
+            f'{url}{comments[0]["id"]}/'
+        ).status_code == 404
+        response = admin_client.post(url, data={'text': 'Чужой'})
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_resolved_once(self, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(url, data={'text': 'Да', 'score': 3})
+        assert response.status_code == 201
+        title_selects = [
+            q['sql'] for q in queries
+            if q['sql'].startswith('SELECT') and 'FROM "reviews_title"' in q['sql']
+        ]
+        assert len(title_selects) == 1, (
+            'Проверьте, что произведение из URL загружается один раз '
+            'за запрос:\n' + '\n'.join(title_selects)
+        )
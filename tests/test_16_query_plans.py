@@ -0,0 +1,59 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+# SCAN subquery — чтение ограниченного LIMIT подзапроса, а не таблицы.
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?(?!subquery$)\S+$')
+
+
+class Test16QueryPlans:
+
+    def get_plans(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plans.append(
+                    (query['sql'], [row[-1] for row in cursor.fetchall()])
+                )
+        return plans
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_list_endpoints_use_indexes(self, client, admin_client, admin):
+        if connection.vendor != 'sqlite':
+            pytest.skip('EXPLAIN QUERY PLAN есть только в SQLite')
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        urls = (
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/titles/',
+            '/api/v1/titles/?cursor=',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            reviews_url,
+            f'{reviews_url}?cursor=',
+            f'{reviews_url}{reviews[0]["id"]}/comments/',
+            f'{reviews_url}{reviews[0]["id"]}/comments/?cursor=',
+        )
+        for url in urls:
+            for sql, plan in self.get_plans(client, url):
+                # Сортировка ограничена страницей только у запросов без LIMIT
+                # (prefetch жанров), у постраничных она должна идти по индексу.
+                bad = [
+                    step for step in plan
+                    if FULL_SCAN.match(step)
+                    or ('TEMP B-TREE' in step and 'LIMIT' in sql)
+                ]
+                assert not bad, (
+                    f'GET запрос `{url}` выполняет полный просмотр таблицы '
+                    f'или сортировку без индекса:\n{sql}\n' + '\n'.join(plan)
+                )
@@ -0,0 +1,101 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def count_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8',
+              newline='') as csv_file:
+        return sum(1 for _ in csv.DictReader(csv_file))
+
+
+class Test17LoadCsv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_load_static_data(self):
+        from django.contrib.auth import get_user_model
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title)
+
+        out = StringIO()
+        call_command('load_csv', batch_size=10, stdout=out)
+        expected = {
+            get_user_model(): 'users.csv',
+            Category: 'category.csv',
+            Genre: 'genre.csv',
+            Title: 'titles.csv',
+            GenreTitle: 'genre_title.csv',
+            Review: 'review.csv',
+            Comment: 'comments.csv',
+        }
+        for model, filename in expected.items():
+            assert model.objects.count() == count_rows(filename), (
+                f'Проверьте, что `load_csv` загружает все строки {filename}'
+            )
+        assert 'строк/с' in out.getvalue()
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.isoformat().startswith('2019-09-24T21:08:21'), (
+            'Проверьте, что `load_csv` сохраняет `pub_date` из файла'
+        )
+        call_command('rebuild_ratings', '--verify', stdout=out)
+        assert Title.objects.exclude(rating=None).exists()
+
+        call_command('load_csv', ignore_conflicts=True, stdout=out)
+        assert Review.objects.count() == count_rows('review.csv')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_sync_writes_only_delta(self, tmp_path):
+        import shutil
+
+        from reviews.models import Genre, GenreTitle, Title
+
+        call_command('load_csv', stdout=StringIO())
+        for filename in os.listdir(DATA_DIR):
+            shutil.copy(os.path.join(DATA_DIR, filename), tmp_path)
+        out = StringIO()
+        call_command('load_csv', sync=True, path=str(tmp_path), stdout=out)
+        assert '+0 ~0 -0' in out.getvalue(), (
+            'Проверьте, что синхронизация без изменений ничего не пишет'
+        )
+
+        genres = (tmp_path / 'genre.csv').read_text(encoding='utf-8')
+        (tmp_path / 'genre.csv').write_text(
+            genres.rstrip('\n') + '\n100,Новый жанр,new-genre\n',
+            encoding='utf-8'
+        )
+        with open(tmp_path / 'titles.csv', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        lines[1] = lines[1].replace('Побег из Шоушенка', 'Побег')
+        (tmp_path / 'titles.csv').write_text(
+            '\n'.join(lines) + '\n', encoding='utf-8'
+        )
+        with open(tmp_path / 'genre_title.csv', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        (tmp_path / 'genre_title.csv').write_text(
+            '\n'.join(lines[:-1]) + '\n', encoding='utf-8'
+        )
+        genre_titles = GenreTitle.objects.count()
+
+        out = StringIO()
+        call_command('load_csv', sync=True, path=str(tmp_path), stdout=out)
+        report = dict(
+            line.split(': ', 1) for line in out.getvalue().splitlines()
+            if ': ' in line
+        )
+        assert report['genre.csv'].startswith('+1 ~0 -0')
+        assert report['titles.csv'].startswith('+0 ~1 -0')
+        assert report['genre_title.csv'].startswith('+0 ~0 -1')
+        assert 'users.csv' not in report
+        assert Genre.objects.filter(slug='new-genre').exists()
+        assert Title.objects.get(pk=1).name == 'Побег'
+        assert Title.objects.get(pk=1).rating is not None, (
+            'Проверьте, что синхронизация не сбрасывает рейтинг'
+        )
+        assert GenreTitle.objects.count() == genre_titles - 1
@@ -0,0 +1,54 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_comments
+
+
+class Test18Export:
+    url = '/api/v1/export/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_endpoint(self, admin_client, user_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        assert user_client.get(f'{self.url}titles/').status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору'
+        )
+        response = admin_client.get(f'{self.url}titles/')
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся через StreamingHttpResponse'
+        )
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        assert [int(row['id']) for row in rows] == sorted(
+            title['id'] for title in titles
+        )
+        first = next(row for row in rows if int(row['id']) == titles[0]['id'])
+        assert first['category'] == titles[0]['category']
+        assert first['genre'].split(',') == sorted(titles[0]['genre'])
+        assert first['rating'] == '4'
+
+        response = admin_client.get(f'{self.url}reviews/?output=ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        data = [json.loads(line) for line in lines]
+        assert [row['id'] for row in data] == [r['id'] for r in reviews]
+        assert data[0]['author'] == reviews[0]['author']
+        assert admin_client.get(f'{self.url}users/').status_code == 404
+        assert admin_client.get(
+            f'{self.url}reviews/?output=xml'
+        ).status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_command(self, admin_client, admin):
+        comments, _, _, _, _ = create_comments(admin_client, admin)
+        out = StringIO()
+        call_command(
+            'export_data', 'comments', output_format='ndjson',
+            chunk_size=1, stdout=out
+        )
+        data = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [row['text'] for row in data] == [c['text'] for c in comments]
@@ -0,0 +1,52 @@
+import pytest
+
+from .common import create_comments
+
+
+class Test19FastReadParity:
+
+    def get_urls(self, titles, reviews, comments):
+        title_id = titles[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        return (
+            '/api/v1/titles/',
+            '/api/v1/titles/?cursor=',
+            '/api/v1/titles/?genre=comedy',
+            '/api/v1/titles/?year=2020',
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            '/api/v1/titles/999/',
+            reviews_url,
+            f'{reviews_url}?cursor=',
+            f'{reviews_url}{reviews[1]["id"]}/',
+            comments_url,
+            f'{comments_url}?cursor=',
+            f'{comments_url}{comments[2]["id"]}/',
+            f'{comments_url}999/',
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_byte_identical(self, client, admin_client, admin,
+                               monkeypatch):
+        from api import views
+        from django.core.cache import cache
+        from reviews.models import Category, Title
+
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        Title.objects.create(name='Без категории', year=1990)
+        Category.objects.filter(slug=titles[1]['category']).delete()
+        urls = self.get_urls(titles, reviews, comments)
+        fast = [client.get(url) for url in urls]
+        cache.clear()
+        for viewset in (views.TitleViewSet, views.ReviewViewSet,
+                        views.CommentViewSet):
+            monkeypatch.setattr(viewset, 'row_builder', None)
+        slow = [client.get(url) for url in urls]
+        for url, fast_response, slow_response in zip(urls, fast, slow):
+            assert fast_response.status_code == slow_response.status_code
+            assert fast_response.content == slow_response.content, (
+                f'Проверьте, что быстрый путь чтения `{url}` отдаёт тот же '
+                f'JSON, что и сериализатор:\n{fast_response.content}\n'
+                f'{slow_response.content}'
+            )
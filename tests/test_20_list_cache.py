@@ -0,0 +1,73 @@
+import pytest
+
+from .common import auth_client, create_titles, create_users_api
+
+
+class Test20TitleListCache:
+    url = '/api/v1/titles/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cache_and_invalidation(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        first = client.get(f'{self.url}?year=2000&name=По')
+        assert first['X-Cache'] == 'MISS'
+        second = client.get(f'{self.url}?name=По&year=2000')
+        assert second['X-Cache'] == 'HIT', (
+            'Проверьте, что порядок параметров не влияет на ключ кэша'
+        )
+        assert second.content == first.content
+
+        user, _ = create_users_api(admin_client)
+        auth_client(user).post(
+            f'{self.url}{titles[0]["id"]}/reviews/',
+            data={'text': 'Да', 'score': 8}
+        )
+        response = client.get(f'{self.url}?year=2000&name=По')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что новый отзыв не сбрасывает кэш страниц списка'
+        )
+        assert response.json()['results'][0]['rating'] == 8, (
+            'Проверьте, что новый отзыв обновляет рейтинг в списке'
+        )
+
+        for write in (
+            lambda: admin_client.patch(
+                f'/api/v1/titles/{titles[0]["id"]}/',
+                data={'genre': [genres[2]['slug']]}
+            ),
+            lambda: admin_client.delete(
+                f'/api/v1/genres/{genres[2]["slug"]}/'
+            ),
+            lambda: admin_client.delete(
+                f'/api/v1/categories/{categories[0]["slug"]}/'
+            ),
+        ):
+            client.get(self.url)
+            assert client.get(self.url)['X-Cache'] == 'HIT'
+            write()
+            assert client.get(self.url)['X-Cache'] == 'MISS'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_cache_stats(self, client, admin_client, user_client,
+                            monkeypatch):
+        from django.core.cache import cache
+
+        stats_url = f'{self.url}cache-stats/'
+        assert user_client.get(stats_url).status_code == 403
+        before = admin_client.get(stats_url).json()
+        client.get(self.url)
+
+        def forbidden(*args, **kwargs):
+            raise AssertionError(
+                'Проверьте, что попадание в кэш списка ничего не пишет в кэш'
+            )
+
+        with monkeypatch.context() as patch:
+            for method in ('set', 'set_many', 'add', 'incr'):
+                patch.setattr(cache, method, forbidden)
+            assert client.get(self.url)['X-Cache'] == 'HIT'
+        response = admin_client.get(stats_url)
+        assert response.status_code == 200
+        data = response.json()
+        assert data['hits'] - before['hits'] == 1
+        assert data['misses'] - before['misses'] == 1
@@ -0,0 +1,127 @@
+import pytest
+
+from .common import (auth_client, create_titles, create_users_api,
+                     run_in_other_process)
+
+
+class Test21TitleObjectCache:
+    url = '/api/v1/titles/'
+
+    @staticmethod
+    def cached_ids(titles):
+        from django.core.cache import cache
+        return {
+            title['id'] for title in titles
+            if cache.get(f'object:title:{title["id"]}') is not None
+        }
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_shared_by_list_and_detail(self, client, admin_client,
+                                          django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        client.get(f'{self.url}{titles[0]["id"]}/')
+        assert self.cached_ids(titles) == {titles[0]['id']}
+        client.get(self.url)
+        assert self.cached_ids(titles) == {titles[0]['id'], titles[1]['id']}
+        # Страница: COUNT и id; представления целиком из кэша.
+        with django_assert_num_queries(2):
+            response = client.get(f'{self.url}?year=2020')
+        assert response.json()['results'][0]['name'] == titles[1]['name']
+        with django_assert_num_queries(1):
+            response = client.get(f'{self.url}{titles[1]["id"]}/')
+        assert response.json()['genre'][0]['slug'] == titles[1]['genre'][0]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_precise_invalidation(self, client, admin_client):
+        from reviews.models import Category
+
+        titles, categories, genres = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        user, _ = create_users_api(admin_client)
+        writes = (
+            (first, lambda: auth_client(user).post(
+                f'{self.url}{first}/reviews/',
+                data={'text': 'Да', 'score': 8}
+            )),
+            (first, lambda: admin_client.patch(
+                f'{self.url}{first}/', data={'description': 'Новое'}
+            )),
+            (second, lambda: Category.objects.filter(
+                slug=categories[1]['slug']
+            ).get().save()),
+            (second, lambda: admin_client.delete(
+                f'/api/v1/categories/{categories[1]["slug"]}/'
+            )),
+            (second, lambda: admin_client.delete(
+                f'/api/v1/genres/{genres[2]["slug"]}/'
+            )),
+        )
+        for title_id, write in writes:
+            client.get(self.url)
+            assert self.cached_ids(titles) == {first, second}
+            write()
+            assert self.cached_ids(titles) == {first, second} - {title_id}, (
+                'Проверьте, что запись сбрасывает кэш только '
+                'затронутого произведения'
+            )
+
+        response = client.get(self.url).json()['results']
+        assert response[0]['rating'] == 8
+        assert response[0]['description'] == 'Новое'
+        assert response[1]['genre'] == []
+        assert response[1]['category'] is None
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('code', (
+        'from django.core.cache import cache; '
+        'from api.cache import object_key, set_new_version; '
+        'cache.delete(object_key("title", {pk})); set_new_version("titles")',
+        # Так сбрасывают кэш load_csv и rebuild_ratings.
+        'from django.core.cache import cache; cache.clear()',
+    ))
+    def test_03_other_process(self, client, admin_client, code):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        pk = titles[0]['id']
+        client.get(self.url)
+        client.get(f'{self.url}{pk}/')
+        # Запись без сигналов: кэш сбрасывает только другой процесс.
+        Title.objects.filter(pk=pk).update(name='Переименовано')
+        run_in_other_process(code.format(pk=pk))
+        assert client.get(f'{self.url}{pk}/').json()['name'] == (
+            'Переименовано'
+        ), 'Проверьте, что сброс кэша в другом процессе виден всем воркерам'
+        assert 'Переименовано' in [
+            title['name'] for title in client.get(self.url).json()['results']
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_open_transaction(self, client, admin_client):
+        from django.core.cache import cache
+        from django.db import transaction
+
+        from reviews.models import Category, Title
+
+        titles, categories, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        client.get(self.url)
+        stale = {
+            pk: cache.get(f'object:title:{pk}') for pk in (first, second)
+        }
+        with transaction.atomic():
+            Title.objects.get(pk=first).save()
+            Title.objects.filter(pk=first).update(name='Переименовано')
+            Category.objects.filter(slug=categories[1]['slug']).delete()
+            # Так кладёт в кэш старые строки чтение из другого
+            # соединения, пока запись не зафиксирована.
+            cache.set_many({
+                f'object:title:{pk}': item for pk, item in stale.items()
+            })
+        assert self.cached_ids(titles) == set(), (
+            'Проверьте, что кэш объектов сбрасывается после фиксации '
+            'транзакции'
+        )
+        response = client.get(self.url).json()['results']
+        assert response[0]['name'] == 'Переименовано'
+        assert response[1]['category'] is None
@@ -0,0 +1,160 @@
+import pytest
+
+from .common import create_comments, create_reviews
+
+
+class Test22ConditionalGet:
+
+    @staticmethod
+    def assert_not_modified(client, url, etag, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Проверьте, что `{url}` с неизменившимся ETag '
+            f'возвращает 304 без запросов к БД'
+        )
+        assert not response.content
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_etag(self, client, admin_client, admin,
+                     django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        urls = (
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            reviews_url,
+            f'{reviews_url}{reviews[0]["id"]}/',
+            comments_url,
+            f'{comments_url}{comments[0]["id"]}/',
+        )
+        etags = {}
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ `{url}` содержит ETag'
+            )
+            etags[url] = response['ETag']
+            self.assert_not_modified(
+                client, url, etags[url], django_assert_num_queries
+            )
+        assert client.get(
+            '/api/v1/categories/?search=Фильм'
+        )['ETag'] != etags['/api/v1/categories/'], (
+            'Проверьте, что ETag зависит от параметров запроса'
+        )
+
+        admin_client.post(
+            f'{comments_url}', data={'text': 'Ещё комментарий'}
+        )
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            changed = url.startswith(comments_url)
+            assert response.status_code == (200 if changed else 304), (
+                'Проверьте, что новый комментарий меняет ETag только '
+                'комментариев своего отзыва'
+            )
+
+        admin_client.delete(f'/api/v1/genres/{titles[0]["genre"][0]}/')
+        response = client.get(
+            '/api/v1/genres/', HTTP_IF_NONE_MATCH=etags['/api/v1/genres/']
+        )
+        assert response.status_code == 200
+        assert client.get(
+            '/api/v1/categories/',
+            HTTP_IF_NONE_MATCH=etags['/api/v1/categories/']
+        ).status_code == 304
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_per_title(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        urls = [
+            f'/api/v1/titles/{title["id"]}/reviews/' for title in titles
+        ]
+        etags = [client.get(url)['ETag'] for url in urls]
+        admin_client.delete(f'{urls[0]}{reviews[0]["id"]}/')
+        assert client.get(
+            urls[0], HTTP_IF_NONE_MATCH=etags[0]
+        ).status_code == 200
+        assert client.get(
+            urls[1], HTTP_IF_NONE_MATCH=etags[1]
+        ).status_code == 304, (
+            'Проверьте, что отзыв меняет ETag только своего произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_last_modified(self, client, admin_client, monkeypatch):
+        from types import SimpleNamespace
+
+        from api import cache
+
+        clock = [1_000_000.0]
+        monkeypatch.setattr(
+            cache, 'time', SimpleNamespace(time=lambda: clock[0])
+        )
+        url = '/api/v1/categories/'
+        admin_client.post(url, data={'name': 'Кино', 'slug': 'kino'})
+        assert not client.get(url).has_header('Last-Modified'), (
+            'Проверьте, что дата изменения в текущую секунду не отдаётся'
+        )
+        clock[0] += 5
+        last_modified = client.get(url)['Last-Modified']
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified
+        ).status_code == 304
+        admin_client.post(url, data={'name': 'Книги', 'slug': 'books'})
+        clock[0] += 5
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified
+        ).status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_expired_version(self, client, admin_client):
+        from django.core.cache import cache
+
+        from api.cache import version_key
+
+        url = '/api/v1/genres/'
+        admin_client.post(url, data={'name': 'Ужасы', 'slug': 'horror'})
+        etag = client.get(url)['ETag']
+        cache.delete(version_key('genres'))
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что после истечения счётчика версии ETag меняется'
+        )
+
+    def test_05_version_names_required(self):
+        from django.core.exceptions import ImproperlyConfigured
+        from rest_framework import viewsets
+
+        from api.cache import ConditionalGetMixin
+
+        with pytest.raises(ImproperlyConfigured):
+            type('Broken', (ConditionalGetMixin, viewsets.GenericViewSet), {})
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_open_transaction(self, client, admin_client, admin,
+                                 django_assert_num_queries):
+        from django.db import transaction
+
+        from reviews.models import Comment
+
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        etag = client.get(url)['ETag']
+        with transaction.atomic():
+            Comment.objects.create(
+                review_id=reviews[0]['id'], author=admin, text='Ещё'
+            )
+            # Так видит ответ чтение из другого соединения, пока запись
+            # не зафиксирована: ETag и строки ещё старые.
+            self.assert_not_modified(
+                client, url, etag, django_assert_num_queries
+            )
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что ETag меняется после фиксации транзакции'
+        )
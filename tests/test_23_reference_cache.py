@@ -0,0 +1,143 @@
+import pytest
+
+from .common import create_titles, run_in_other_process
+
+
+class Test23ReferenceCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_no_queries_for_reference_tables(self, client, admin_client,
+                                                django_assert_num_queries):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        titles, categories, genres = create_titles(admin_client)
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/genres/')
+        for url in ('/api/v1/categories/', '/api/v1/genres/?search=жас'):
+            with django_assert_num_queries(0):
+                response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что `{url}` берёт данные из справочника в памяти'
+            )
+        assert [
+            genre['slug'] for genre in response.json()['results']
+        ] == ['horror']
+
+        with CaptureQueriesContext(connection) as queries:
+            detail = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+            response = client.get(
+                f'/api/v1/titles/?genre={genres[2]["slug"]}'
+                f'&category={categories[1]["slug"]}'
+            )
+        assert detail.json()['category']['slug'] == categories[0]['slug']
+        assert [
+            title['id'] for title in response.json()['results']
+        ] == [titles[1]['id']]
+        for query in queries:
+            assert 'reviews_category' not in query['sql'], query['sql']
+            assert 'reviews_genre"' not in query['sql'], query['sql']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalidation(self, client, admin_client):
+        from reviews.models import Category
+
+        titles, _, _ = create_titles(admin_client)
+        client.get('/api/v1/categories/')
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Игры', 'slug': 'games'}
+        )
+        names = [
+            category['name']
+            for category in client.get('/api/v1/categories/').json()['results']
+        ]
+        assert 'Игры' in names, (
+            'Проверьте, что новая категория сбрасывает справочник в памяти'
+        )
+
+        category = Category.objects.get(slug='games')
+        category.name = 'Видеоигры'
+        category.save()
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'category': 'games'}
+        )
+        assert response.status_code == 200
+        assert response.json()['category'] == 'games'
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['category']['name'] == 'Видеоигры'
+
+        admin_client.delete('/api/v1/categories/games/')
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/', data={'category': 'games'}
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что удалённая категория недоступна при записи'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_other_process(self, client, admin_client):
+        from reviews.models import Category
+
+        create_titles(admin_client)
+        client.get('/api/v1/categories/')
+        # Запись без сигналов, о ней знает только другой процесс.
+        Category.objects.filter(slug='films').update(name='Кинофильм')
+        run_in_other_process(
+            'from api.cache import set_new_version; '
+            'set_new_version("categories")'
+        )
+        names = [
+            category['name']
+            for category in client.get('/api/v1/categories/').json()['results']
+        ]
+        assert 'Кинофильм' in names, (
+            'Проверьте, что версию, изменённую другим процессом, видят '
+            'все воркеры: кэш должен быть общим'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_ttl(self, client, admin_client, settings):
+        from reviews.models import Genre
+
+        settings.REFERENCE_TABLE_TTL = 0
+        create_titles(admin_client)
+        client.get('/api/v1/genres/')
+        Genre.objects.filter(slug='drama').update(name='Трагедия')
+        names = [
+            genre['name']
+            for genre in client.get('/api/v1/genres/').json()['results']
+        ]
+        assert 'Трагедия' in names, (
+            'Проверьте, что справочник перечитывается по истечении '
+            'REFERENCE_TABLE_TTL'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_version_read_once(self, client, admin_client, monkeypatch):
+        from django.core.cache import cache
+
+        from api.cache import get_version, version_key
+
+        titles, _, _ = create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        # Представления произведений строятся заново по справочникам.
+        cache.delete_many([f'object:title:{title["id"]}' for title in titles])
+        reads = []
+        cache_get = cache.get
+
+        def counting_get(key, *args, **kwargs):
+            reads.append(key)
+            return cache_get(key, *args, **kwargs)
+
+        monkeypatch.setattr(cache, 'get', counting_get)
+        assert client.get('/api/v1/titles/').status_code == 200
+        for name in ('categories', 'genres'):
+            assert reads.count(version_key(name)) <= 1, (
+                'Проверьте, что версия справочника читается из общего '
+                'кэша не чаще раза за запрос'
+            )
+        version = get_version('categories')
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Игры', 'slug': 'games'}
+        )
+        assert get_version('categories') != version
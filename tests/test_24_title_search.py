@@ -0,0 +1,80 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test24TitleSearch:
+    url = '/api/v1/titles/'
+
+    def ids(self, client, query):
+        response = client.get(f'{self.url}?{query}')
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{self.url}?{query}` '
+            f'возвращает статус 200'
+        )
+        return [title['id'] for title in response.json()['results']]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_name_case_insensitive(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.ids(client, 'name=поворот') == [titles[0]['id']], (
+            'Проверьте, что поиск по названию не зависит от регистра '
+            'кириллицы'
+        )
+        assert self.ids(client, 'name=ПОВ ТУД') == [titles[0]['id']], (
+            'Проверьте, что слова названия ищутся как префиксы'
+        )
+        assert self.ids(client, 'name=драма') == [], (
+            'Проверьте, что `name` ищет только по названию'
+        )
+        for query in ('"', 'AND', 'name:*', 'NEAR(', '!!!'):
+            assert self.ids(client, f'name={query}') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_relevance(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post(self.url, data={
+            'name': 'Драма', 'year': 2001, 'genre': titles[1]['genre'],
+            'category': titles[1]['category'], 'description': 'Просто',
+        })
+        drama = self.ids(client, 'name=драма')
+        assert self.ids(client, 'search=драма') == [
+            drama[0], titles[1]['id']
+        ], (
+            'Проверьте, что `search` ищет по названию и описанию и ставит '
+            'совпадения в названии выше'
+        )
+        assert self.ids(client, 'search=драма&cursor=') == [
+            drama[0], titles[1]['id']
+        ], 'Проверьте, что поиск работает с курсорной пагинацией'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_index_follows_writes(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.url}{titles[1]["id"]}/', data={'name': 'Ёлки'}
+        )
+        assert self.ids(client, 'name=елки') == [titles[1]['id']]
+        assert self.ids(client, 'name=проект') == []
+        Title.objects.filter(pk=titles[0]['id']).delete()
+        assert self.ids(client, 'search=поворот') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_rebuild(self, admin_client):
+        from django.db import connection
+        from reviews import search
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.filter(pk=titles[0]['id']).update(name='Новое имя')
+        search.rebuild_index()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, name FROM {search.FTS_TABLE} ORDER BY rowid'
+            )
+            assert cursor.fetchall() == [
+                (titles[0]['id'], 'новое имя'),
+                (titles[1]['id'], 'проект'),
+            ]
@@ -0,0 +1,63 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test25TitleFilters:
+    url = '/api/v1/titles/'
+
+    def ids(self, client, query):
+        response = client.get(f'{self.url}?{query}')
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{self.url}?{query}` '
+            f'возвращает статус 200'
+        )
+        return sorted(title['id'] for title in response.json()['results'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_exact_and_multi_value(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        horror, comedy, drama = (genre['slug'] for genre in genres)
+        cases = (
+            (f'genre={comedy}', [first]),
+            (f'genre={comedy},{drama}', [first, second]),
+            (f'genre={horror},{comedy}&genre_match=all', [first]),
+            (f'genre={comedy},{drama}&genre_match=all', []),
+            (f'genre={horror},nope&genre_match=all', []),
+            (f'genre={horror},nope', [first]),
+            ('genre=com', []),
+            ('genre_contains=RAM', [second]),
+            (f'category={categories[0]["slug"]},{categories[1]["slug"]}',
+             [first, second]),
+            ('category=ilm', []),
+            ('category_contains=ilm', [first]),
+        )
+        for query, expected in cases:
+            assert self.ids(client, query) == expected, (
+                f'Проверьте фильтрацию произведений по `{query}`'
+            )
+        assert client.get(
+            f'{self.url}?genre={comedy}&genre_match=some'
+        ).status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_subqueries_without_joins(self, client, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        titles, categories, genres = create_titles(admin_client)
+        slugs = ','.join(genre['slug'] for genre in genres[:2])
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/categories/')
+        with CaptureQueriesContext(connection) as queries:
+            client.get(
+                f'{self.url}?genre={slugs}&genre_match=all'
+                f'&category={categories[0]["slug"]}'
+            )
+        for query in queries:
+            sql = query['sql']
+            assert 'JOIN' not in sql and 'DISTINCT' not in sql, (
+                'Проверьте, что фильтры по жанрам и категориям '
+                'выполняются подзапросами без JOIN: ' + sql
+            )
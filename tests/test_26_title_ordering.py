@@ -0,0 +1,130 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_titles, create_users_api
+
+
+class Test26TitleOrdering:
+    url = '/api/v1/titles/'
+
+    @staticmethod
+    def create_catalog():
+        from reviews.models import Title
+
+        ratings = (7, None, 3, 9, None, 7, 1, 10, 5, None, 7, 2, 8)
+        return [
+            Title.objects.create(
+                name=f'Произведение {i:02}', year=1990 + i % 5,
+                rating=rating
+            )
+            for i, rating in enumerate(ratings)
+        ]
+
+    def walk(self, client, url):
+        """id всех страниц по ссылкам next, затем обратно по previous."""
+        pages = [client.get(url).json()]
+        while pages[-1]['next']:
+            pages.append(client.get(pages[-1]['next']).json())
+        forward = [item['id'] for page in pages for item in page['results']]
+        backward = [item['id'] for item in pages[-1]['results']]
+        page = pages[-1]
+        while page['previous']:
+            page = client.get(page['previous']).json()
+            backward[:0] = [item['id'] for item in page['results']]
+        return forward, backward
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_orderings(self, client):
+        titles = self.create_catalog()
+        expected = {
+            'name': sorted(titles, key=lambda t: (t.name, t.id)),
+            'year': sorted(titles, key=lambda t: (t.year, t.id)),
+            'newest': sorted(titles, key=lambda t: (-t.year, -t.id)),
+            'rating': sorted(titles, key=lambda t: (
+                t.rating is None, -(t.rating or 0), t.id
+            )),
+        }
+        for ordering, ordered in expected.items():
+            ids = [title.id for title in ordered]
+            for url in (
+                f'{self.url}?ordering={ordering}&cursor=',
+                f'{self.url}?ordering={ordering}',
+            ):
+                forward, backward = self.walk(client, url)
+                assert forward == ids, (
+                    f'Проверьте порядок произведений для `{url}`'
+                )
+                assert backward == ids, (
+                    f'Проверьте обратный проход по страницам для `{url}`'
+                )
+        assert client.get(
+            f'{self.url}?ordering=popular'
+        ).status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_ranges(self, client):
+        titles = self.create_catalog()
+        for query, check in (
+            ('year_min=1992', lambda t: t.year >= 1992),
+            ('year_max=1991', lambda t: t.year <= 1991),
+            ('year_min=1991&year_max=1993', lambda t: 1991 <= t.year <= 1993),
+            ('rating_min=7', lambda t: t.rating is not None and t.rating >= 7),
+        ):
+            response = client.get(f'{self.url}?{query}&ordering=rating')
+            data = response.json()
+            assert data['count'] == len([t for t in titles if check(t)]), (
+                f'Проверьте фильтр `{query}`'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rating_pages_follow_reviews(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        user, _ = create_users_api(admin_client)
+        url = f'{self.url}?ordering=rating'
+        plain = client.get(self.url)
+        assert client.get(url)['X-Cache'] == 'MISS'
+        auth_client(user).post(
+            f'{self.url}{titles[1]["id"]}/reviews/',
+            data={'text': 'Да', 'score': 8}
+        )
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что отзыв сбрасывает кэш страниц, '
+            'упорядоченных по рейтингу'
+        )
+        assert response.json()['results'][0]['id'] == titles[1]['id']
+        assert client.get(self.url)['X-Cache'] == 'HIT'
+        assert plain['X-Cache'] == 'MISS'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_index_plans(self, client):
+        if connection.vendor != 'sqlite':
+            pytest.skip('EXPLAIN QUERY PLAN есть только в SQLite')
+        self.create_catalog()
+        for query in (
+            'ordering=year&year_min=1992&cursor=',
+            'ordering=newest&year_max=1993&cursor=',
+            'ordering=rating&rating_min=5&cursor=',
+            'ordering=rating&cursor=',
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                first = client.get(f'{self.url}?{query}').json()
+                client.get(first['next'] or f'{self.url}?{query}')
+            with connection.cursor() as cursor:
+                for sql in (q['sql'] for q in queries):
+                    if 'LIMIT' not in sql or 'reviews_title' not in sql:
+                        continue
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plan = [row[-1] for row in cursor.fetchall()]
+                    bad = [
+                        step for step in plan
+                        if 'TEMP B-TREE' in step
+                        or re.match(r'^SCAN (TABLE )?\S+$', step)
+                    ]
+                    assert not bad, (
+                        f'Проверьте, что `{query}` идёт по индексу:\n{sql}\n'
+                        + '\n'.join(plan)
+                    )
@@ -0,0 +1,91 @@
+import pytest
+
+from .common import create_reviews
+
+
+class Test27EstimatedCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_exact_below_limit(self, client, admin_client, admin,
+                                  settings):
+        settings.PAGINATION_EXACT_COUNT_LIMIT = 3
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = client.get(url).json()
+        assert data['count'] == 3
+        assert 'count_approximate' not in data, (
+            'Проверьте, что до порога count точный и без флага'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_cached_above_limit(self, client, admin_client, admin,
+                                   settings):
+        from reviews.models import Review
+
+        settings.PAGINATION_EXACT_COUNT_LIMIT = 1
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = client.get(url).json()
+        assert data['count'] == 3 and 'count_approximate' not in data, (
+            'Проверьте, что первый подсчёт выше порога точный'
+        )
+        Review.objects.filter(pk=reviews[0]['id']).delete()
+        data = client.get(url).json()
+        assert list(data)[:2] == ['count', 'count_approximate']
+        assert data['count'] == 3 and data['count_approximate'] is True, (
+            'Проверьте, что выше порога count берётся из кэша '
+            'с флагом count_approximate'
+        )
+        assert len(data['results']) == 2
+
+        client.get('/api/v1/titles/?year=2000')
+        data = client.get('/api/v1/titles/?year=2000&cursor=').json()
+        assert 'count' not in data
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_admin_changelists(self, admin_client, admin, settings):
+        from django.contrib.admin.sites import site
+        from django.test import RequestFactory
+
+        from reviews.models import Comment, Review
+        from reviews.paginator import EstimatedCountPaginator
+
+        settings.PAGINATION_EXACT_COUNT_LIMIT = 1
+        create_reviews(admin_client, admin)
+        admin.is_staff = admin.is_superuser = True
+        admin.save()
+        for model, count in ((Review, 3), (Comment, 0)):
+            request = RequestFactory().get('/admin/')
+            request.user = admin
+            changelist = site._registry[model].get_changelist_instance(
+                request
+            )
+            assert isinstance(changelist.paginator, EstimatedCountPaginator)
+            assert changelist.result_count == count
+            assert changelist.full_result_count is None, (
+                'Проверьте, что список в админке не считает все строки '
+                'таблицы отдельным COUNT(*)'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_pk_range_estimate(self, client, settings):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Title
+
+        settings.PAGINATION_EXACT_COUNT_LIMIT = 1
+        titles = [
+            Title.objects.create(name=f'Произведение {i}', year=2000)
+            for i in range(4)
+        ]
+        titles[1].delete()
+        with CaptureQueriesContext(connection) as queries:
+            data = client.get('/api/v1/titles/').json()
+        assert data['count'] == 4 and data['count_approximate'] is True, (
+            'Проверьте, что число строк без фильтров оценивается '
+            'по диапазону id'
+        )
+        assert all(
+            'LIMIT' in q['sql'] for q in queries if 'COUNT(' in q['sql']
+        ), 'Проверьте, что выборка без фильтров не считается COUNT(*)'
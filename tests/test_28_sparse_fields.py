@@ -0,0 +1,119 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments, create_users_api
+
+
+class Test28SparseFields:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        return response.json(), '\n'.join(q['sql'] for q in queries)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles(self, client, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        url = '/api/v1/titles/'
+        data, _ = self.get(client, f'{url}?fields=rating,id,name')
+        assert [list(item) for item in data['results']] == [
+            ['id', 'name', 'rating']
+        ] * 2, 'Проверьте, что ?fields= оставляет только указанные поля'
+        data, _ = self.get(client, f'{url}?omit=description,genre')
+        assert list(data['results'][0]) == [
+            'id', 'name', 'year', 'rating', 'category'
+        ]
+        for query in ('fields=name,year', 'omit=id'):
+            for cache in ('MISS', 'HIT'):
+                response = client.get(f'{url}?{query}')
+                assert response.status_code == 200, (
+                    f'Проверьте, что `{url}?{query}` без поля id '
+                    'возвращает статус 200'
+                )
+                assert response['X-Cache'] == cache
+                assert all('id' not in item
+                           for item in response.json()['results'])
+        data, _ = self.get(client, f'{url}?fields=name,year')
+        assert data['results'][0] == {
+            'name': titles[0]['name'], 'year': titles[0]['year']
+        }
+        full, _ = self.get(client, f'{url}{titles[0]["id"]}/')
+        data, _ = self.get(client, f'{url}{titles[0]["id"]}/?fields=genre')
+        assert data == {'genre': full['genre']}
+        for query in ('fields=id,secret', 'omit=id,name,year,rating,'
+                      'description,genre,category'):
+            response = client.get(f'{url}?{query}')
+            assert response.status_code == 400, (
+                f'Проверьте, что `{url}?{query}` возвращает статус 400'
+            )
+            assert 'fields' in response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_comments(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data, sql = self.get(client, f'{url}?fields=id,score')
+        assert data['results'][0] == {
+            'id': reviews[0]['id'], 'score': reviews[0]['score']
+        }
+        assert '"text"' not in sql and '"reviews_user"' not in sql, (
+            'Проверьте, что невыбранные поля не читаются из БД'
+        )
+        data, sql = self.get(
+            client, f'{url}{reviews[0]["id"]}/comments/?omit=text,pub_date'
+        )
+        assert list(data['results'][0]) == ['id', 'author']
+        comments_sql = [
+            line for line in sql.splitlines()
+            if line.startswith('SELECT "reviews_comment"')
+        ]
+        assert comments_sql and all(
+            '"text"' not in line for line in comments_sql
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_serializer_endpoints(self, client, admin_client):
+        create_users_api(admin_client)
+        data, sql = self.get(admin_client, '/api/v1/users/?fields=role,username')
+        assert all(list(item) == ['username', 'role']
+                   for item in data['results'])
+        users_sql = [line for line in sql.splitlines() if 'LIMIT' in line]
+        assert users_sql and '"email"' not in users_sql[0], (
+            'Проверьте, что для сериализатора поля ограничиваются через only()'
+        )
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Кино', 'slug': 'kino'}
+        )
+        data, _ = self.get(client, '/api/v1/categories/?fields=slug')
+        assert data['results'] == [{'slug': 'kino'}]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_cursor(self, client, django_user_model):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Фильм', year=2000)
+        reviews = [
+            Review.objects.create(
+                title=title, text='Текст', score=i % 10 + 1,
+                author=django_user_model.objects.create_user(
+                    username=f'reader{i}', email=f'reader{i}@yamdb.fake'
+                )
+            )
+            for i in range(12)
+        ]
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor=&fields=id,score'
+        pages = [self.get(client, url)[0]]
+        while pages[-1]['next']:
+            pages.append(self.get(client, pages[-1]['next'])[0])
+        assert len(pages) == 2, (
+            'Проверьте, что ?fields= не мешает курсорной пагинации'
+        )
+        assert [
+            item for page in pages for item in page['results']
+        ] == [{'id': review.id, 'score': review.score} for review in reviews]
+        previous, _ = self.get(client, pages[-1]['previous'])
+        assert previous['results'] == pages[0]['results']
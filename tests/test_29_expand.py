@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_comments
+
+
+class Test29Expand:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        return response.json(), [q['sql'] for q in queries]
+
+    @staticmethod
+    def count(queries, table):
+        return len([
+            sql for sql in queries if sql.startswith(f'SELECT "{table}".')
+        ])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title(self, client, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        latest = auth_client(user).post(
+            f'{url}reviews/{reviews[2]["id"]}/comments/', data={'text': 'Да'}
+        ).json()
+        plain, _ = self.get(client, url)
+        assert 'reviews' not in plain
+
+        data, _ = self.get(client, f'{url}?expand=reviews&reviews_limit=2')
+        assert [item['id'] for item in data['reviews']] == [
+            reviews[2]['id'], reviews[1]['id']
+        ], 'Проверьте, что ?expand=reviews отдаёт последние отзывы'
+        assert 'comments' not in data['reviews'][0]
+        assert {key: data[key] for key in plain} == plain
+
+        data, queries = self.get(
+            client, f'{url}?expand=reviews.comments&comments_limit=1'
+        )
+        assert [
+            [comment['id'] for comment in review['comments']]
+            for review in data['reviews']
+        ] == [[latest['id']], [], [comments[2]['id']]], (
+            'Проверьте, что comments_limit ограничивает комментарии '
+            'каждого отзыва'
+        )
+        assert set(data['reviews'][0]) == {
+            'id', 'text', 'author', 'score', 'pub_date', 'comments'
+        }
+        assert self.count(queries, 'reviews_review') == 1
+        assert self.count(queries, 'reviews_comment') == 1, (
+            'Проверьте, что комментарии всех отзывов читаются одним запросом'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews(self, client, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?expand=comments'
+        data, queries = self.get(client, url)
+        assert [len(item['comments']) for item in data['results']] == [
+            3, 0, 0
+        ]
+        assert data['results'][0]['comments'][0] == {
+            **comments[2],
+            'pub_date': data['results'][0]['comments'][0]['pub_date'],
+        }
+        assert self.count(queries, 'reviews_comment') == 1
+
+        etag = client.get(url)['ETag']
+        auth_client(user).post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[1]["id"]}/comments/', data={'text': 'Да'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый комментарий меняет ETag списка '
+            'отзывов с ?expand=comments'
+        )
+        assert len(response.json()['results'][1]['comments']) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_errors(self, client, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        for url, key in (
+            (f'{title_url}?expand=comments', 'expand'),
+            (f'{title_url}?expand=reviews&reviews_limit=0', 'reviews_limit'),
+            (f'{title_url}?expand=reviews&fields=name', 'expand'),
+            ('/api/v1/titles/?expand=reviews', 'expand'),
+            (f'{title_url}reviews/?expand=comments&comments_limit=x',
+             'comments_limit'),
+        ):
+            response = client.get(url)
+            assert response.status_code == 400, (
+                f'Проверьте, что `{url}` возвращает статус 400'
+            )
+            assert key in response.json()
@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments, create_users_api
+
+
+class Test30MultiGet:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        return response.json(), [q['sql'] for q in queries]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles(self, client, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        first, second = titles[0]['id'], titles[1]['id']
+        missing = second + 100
+        url = f'/api/v1/titles/?ids={second},{missing},{first},{second}'
+        data, queries = self.get(client, url)
+        assert [item['id'] for item in data['results']] == [second, first], (
+            'Проверьте, что ?ids= возвращает объекты в порядке запроса'
+        )
+        assert data['results'][0] == client.get(
+            f'/api/v1/titles/{second}/'
+        ).json()
+        assert data['missing'] == [missing], (
+            'Проверьте, что ненайденные id перечислены в missing'
+        )
+        assert len([
+            sql for sql in queries if 'IN (' in sql
+            and sql.startswith('SELECT "reviews_title"')
+        ]) == 1, 'Проверьте, что произведения читаются одним запросом IN'
+        data, queries = self.get(client, f'{url}&fields=name')
+        assert data['results'] == [
+            {'name': titles[1]['name']}, {'name': titles[0]['name']}
+        ]
+        titles_sql = [
+            sql for sql in queries if sql.startswith('SELECT "reviews_title"')
+        ]
+        assert len(titles_sql) == 1 and f'IN ({missing})' in titles_sql[0], (
+            'Проверьте, что повторный запрос берёт найденные произведения '
+            'из кэша'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_users(self, client, admin_client, admin):
+        _, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data, _ = self.get(
+            client, f'{url}?ids={reviews[2]["id"]},{reviews[0]["id"]}'
+        )
+        assert [item['id'] for item in data['results']] == [
+            reviews[2]['id'], reviews[0]['id']
+        ]
+        data, _ = self.get(
+            client, f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+            f'?ids={reviews[0]["id"]}'
+        )
+        assert data == {'results': [], 'missing': [reviews[0]['id']]}, (
+            'Проверьте, что ?ids= ищет отзывы только у произведения из URL'
+        )
+
+        users_url = (
+            f'/api/v1/users/?usernames={moderator.username},nobody,'
+            f'{user.username}'
+        )
+        assert client.get(users_url).status_code == 401
+        data, _ = self.get(admin_client, users_url)
+        assert [item['username'] for item in data['results']] == [
+            moderator.username, user.username
+        ]
+        assert data['missing'] == ['nobody']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_errors(self, client, admin_client, settings):
+        create_users_api(admin_client)
+        settings.MULTI_GET_MAX_SIZE = 2
+        for url, key in (
+            ('/api/v1/titles/?ids=1,2,3', 'ids'),
+            ('/api/v1/titles/?ids=1,x', 'ids'),
+            ('/api/v1/titles/?ids=', 'ids'),
+        ):
+            response = client.get(url)
+            assert response.status_code == 400, (
+                f'Проверьте, что `{url}` возвращает статус 400'
+            )
+            assert key in response.json()
+        assert admin_client.get(
+            '/api/v1/users/?usernames=a,b,c'
+        ).status_code == 400
@@ -0,0 +1,103 @@
+import pytest
+from rest_framework.test import APIClient
+
+from .common import auth_client, create_reviews
+
+
+class Test31Batch:
+    url = '/api/v1/batch/'
+
+    def post(self, client, requests, **extra):
+        response = client.post(
+            self.url, data={'requests': requests, **extra}, format='json'
+        )
+        assert response.status_code == 200, (
+            f'Проверьте, что POST запрос `{self.url}` возвращает статус 200'
+        )
+        return response.json()['responses']
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('parallel', (False, True))
+    def test_01_reads(self, client, admin_client, admin, parallel):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        urls = [
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/titles/?search=драма',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+        ]
+        responses = self.post(
+            APIClient(), [{'url': url} for url in urls]
+            + [{'url': '/api/v1/nothing/'}],
+            parallel=parallel
+        )
+        assert [item['status'] for item in responses] == [200] * 5 + [404]
+        for url, item in zip(urls, responses):
+            assert item['body'] == client.get(url).json(), (
+                f'Проверьте, что подзапрос `{url}` отвечает как обычный GET'
+            )
+        assert 'ETag' in responses[0]['headers']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_auth_and_writes(self, admin_client, admin):
+        _, titles, user, _ = create_reviews(admin_client, admin)
+        responses = self.post(APIClient(), [{'url': '/api/v1/users/me/'}])
+        assert responses[0]['status'] == 401, (
+            'Проверьте, что подзапросы выполняются с авторизацией вызывающего'
+        )
+        reviews_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        responses = self.post(auth_client(user), [
+            {'url': '/api/v1/users/me/'},
+            {'url': reviews_url},
+            {'method': 'POST', 'url': reviews_url,
+             'body': {'text': 'Хорошо', 'score': 7}},
+            {'url': reviews_url},
+            {'method': 'DELETE', 'url': '/api/v1/categories/films/'},
+        ], parallel=True)
+        assert [item['status'] for item in responses] == [
+            200, 200, 201, 200, 403
+        ]
+        assert responses[0]['body']['username'] == user.username
+        assert responses[1]['body']['count'] == 0
+        assert [item['id'] for item in responses[3]['body']['results']] == [
+            responses[2]['body']['id']
+        ], 'Проверьте, что чтение после записи видит её результат'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_errors(self, settings):
+        client = APIClient()
+        settings.BATCH_MAX_REQUESTS = 2
+        for data in (
+            {'requests': []},
+            {'requests': [{'url': '/api/v1/genres/'}] * 3},
+            {'requests': [{'url': 'https://example.com/'}]},
+            {'requests': [{'method': 'TRACE', 'url': '/api/v1/genres/'}]},
+        ):
+            response = client.post(self.url, data=data, format='json')
+            assert response.status_code == 400, (
+                f'Проверьте, что `{self.url}` отклоняет {data}'
+            )
+        responses = self.post(client, [{'url': self.url}])
+        assert responses[0]['status'] == 400, (
+            'Проверьте, что batch нельзя вложить в batch'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('parallel', (False, True))
+    def test_04_failed_sub_request(self, monkeypatch, parallel):
+        from api.views import GenreViewSet
+
+        def broken(*args, **kwargs):
+            raise RuntimeError('сбой')
+
+        monkeypatch.setattr(GenreViewSet, 'list', broken)
+        responses = self.post(APIClient(), [
+            {'url': '/api/v1/genres/'},
+            {'url': '/api/v1/%63ategories/'},
+        ], parallel=parallel)
+        assert [item['status'] for item in responses] == [500, 200], (
+            'Проверьте, что ошибка подзапроса не прерывает batch, '
+            'а путь раскодируется как у сервера WSGI'
+        )
+        assert 'detail' in responses[0]['body']